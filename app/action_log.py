@@ -0,0 +1,49 @@
+from typing import Iterable, List, Optional
+
+from app.models import GameActionsResp
+
+
+class ActionLog:
+    """Actions of one match received from the server, indexed by turn.
+
+    Only actions that are not known yet are added, so the whole history can be synced again without applying
+    anything twice. ``latest_turn`` is the cursor to ask the server only for the actions from that turn on.
+    """
+
+    def __init__(self):
+        self._actions_by_turn: dict[int, List[GameActionsResp]] = {}
+        self._ids: set = set()
+        self.latest_turn: Optional[int] = None
+
+    @property
+    def ids(self) -> set:
+        return self._ids
+
+    @staticmethod
+    def get_key(actions: GameActionsResp):
+        if actions.id is not None:
+            return actions.id
+        return actions.turn, actions.team_id, actions.created_time
+
+    def add(self, list_actions: Iterable[GameActionsResp]) -> List[GameActionsResp]:
+        """Add the actions that are not in the log yet and return them."""
+        new_actions = []
+        for actions in list_actions:
+            key = self.get_key(actions=actions)
+            if key in self._ids:
+                continue
+            self._ids.add(key)
+            self._actions_by_turn.setdefault(actions.turn, []).append(actions)
+            if self.latest_turn is None or actions.turn > self.latest_turn:
+                self.latest_turn = actions.turn
+            new_actions.append(actions)
+        return new_actions
+
+    def get_latest_actions(self, turn: int) -> Optional[GameActionsResp]:
+        """Return the last actions sent for ``turn``, the ones the server uses."""
+        actions = self._actions_by_turn.get(turn)
+        return actions[-1] if actions else None
+
+    def get_turn_actions(self, turn: int) -> List[GameActionsResp]:
+        """Return the last actions of every turn up to ``turn``, ordered by turn."""
+        return [self._actions_by_turn[key][-1] for key in sorted(self._actions_by_turn) if key <= turn]
@@ -0,0 +1,147 @@
+import numpy as np
+
+from app.board_state import BoardState
+from app.helpers import ActionType, Terrain, Owner, TerritoryFlag, ACTION_LIST, MOVE_OFFSETS, \
+    BUILD_AND_DESTROY_OFFSETS
+
+ACTION_TYPES = np.array([
+    0 if action == ActionType.STAY else
+    1 if action == ActionType.MOVE else
+    2 if action == ActionType.BUILD else 3
+    for (action, _) in ACTION_LIST], dtype=np.int8)
+ACTION_OFFSETS = np.array([
+    (0, 0) if action == ActionType.STAY else
+    MOVE_OFFSETS[param] if action == ActionType.MOVE else BUILD_AND_DESTROY_OFFSETS[param]
+    for (action, param) in ACTION_LIST], dtype=np.int32)
+MOVE, BUILD, DESTROY = 1, 2, 3
+TERRITORY_TRANSITIONS = np.array([
+    BoardState.change_territory_status(flags=flags, is_close_territory_a=bool(close & 1),
+                                       is_close_territory_b=bool(close & 2))
+    for flags in range(256) for close in range(4)], dtype=np.uint8)
+
+
+class BatchSimulator:
+    """Step many copies of one match at the same time.
+
+    Board arrays have the shape ``(size, width, height)`` so that ``walls[n].ravel()`` has the same
+    ``x * height + y`` order as ``BoardState``. Actions are given as indexes of ``ACTION_LIST``, one per
+    craftsman and board, and are resolved like ``BoardState.apply_turn``.
+    """
+
+    def __init__(self, board: BoardState, size: int):
+        self.size: int = size
+        self.width: int = board.width
+        self.height: int = board.height
+        self.terrain: np.ndarray = np.frombuffer(bytes(board.terrain), dtype=np.uint8) \
+            .reshape(board.width, board.height)
+        self.walls: np.ndarray = np.tile(
+            np.frombuffer(bytes(board.walls), dtype=np.uint8).reshape(board.width, board.height), (size, 1, 1))
+        self.territory: np.ndarray = np.tile(
+            np.frombuffer(bytes(board.territory), dtype=np.uint8).reshape(board.width, board.height), (size, 1, 1))
+        self.craftsman_sides: np.ndarray = np.frombuffer(bytes(board.craftsman_sides), dtype=np.uint8)
+        self.craftsman_positions: np.ndarray = np.tile(
+            np.array(board.craftsman_positions, dtype=np.int32), (size, 1))
+        self.castle_coeff: int = board.castle_coeff
+        self.territory_coeff: int = board.territory_coeff
+        self.wall_coeff: int = board.wall_coeff
+
+    def step(self, actions: np.ndarray):
+        """Apply one turn on every board, ``actions`` has the shape ``(size, number of craftsmen)``."""
+        action_types = ACTION_TYPES[actions]
+        offsets = ACTION_OFFSETS[actions]
+        (x, y) = np.divmod(self.craftsman_positions, self.height)
+        target_x = x + offsets[..., 0]
+        target_y = y + offsets[..., 1]
+        inside = (target_x >= 0) & (target_x < self.width) & (target_y >= 0) & (target_y < self.height)
+        target_x = np.clip(target_x, 0, self.width - 1)
+        target_y = np.clip(target_y, 0, self.height - 1)
+        boards = np.broadcast_to(np.arange(self.size)[:, None], actions.shape)
+        sides = np.broadcast_to(self.craftsman_sides[None, :], actions.shape)
+        occupied = np.zeros((self.size, self.width, self.height), dtype=bool)
+        occupied[boards, x, y] = True
+        touched = np.zeros((self.size, self.width, self.height), dtype=bool)
+
+        destroy = inside & (action_types == DESTROY)
+        destroy &= self.walls[boards, target_x, target_y] != Owner.NONE
+        touched[boards[destroy], target_x[destroy], target_y[destroy]] = True
+        self.walls[boards[destroy], target_x[destroy], target_y[destroy]] = Owner.NONE
+
+        build = inside & (action_types == BUILD)
+        build &= (self.terrain[target_x, target_y] == Terrain.NEUTRAL) \
+            & (self.walls[boards, target_x, target_y] == Owner.NONE) & ~occupied[boards, target_x, target_y]
+        builders = np.zeros((self.size, self.width, self.height, 3), dtype=bool)
+        builders[boards[build], target_x[build], target_y[build], sides[build]] = True
+        build &= ~(builders[..., Owner.A] & builders[..., Owner.B])[boards, target_x, target_y]
+        touched[boards[build], target_x[build], target_y[build]] = True
+        self.walls[boards[build], target_x[build], target_y[build]] = sides[build]
+
+        move = inside & (action_types == MOVE)
+        target_walls = self.walls[boards, target_x, target_y]
+        move &= (self.terrain[target_x, target_y] != Terrain.POND) \
+            & ((target_walls == Owner.NONE) | (target_walls == sides)) & ~occupied[boards, target_x, target_y]
+        target_count = np.zeros((self.size, self.width, self.height), dtype=np.int32)
+        np.add.at(target_count, (boards[move], target_x[move], target_y[move]), 1)
+        move &= target_count[boards, target_x, target_y] == 1
+        self.craftsman_positions[move] = target_x[move] * self.height + target_y[move]
+
+        self.territory[touched] = TerritoryFlag.NONE
+        self.update_territory()
+
+    def update_territory(self):
+        close_territory = self.find_close_territory()
+        index = self.territory.astype(np.int32) * 4 + close_territory[0] + close_territory[1] * 2
+        self.territory = TERRITORY_TRANSITIONS[index]
+
+    def find_close_territory(self) -> np.ndarray:
+        """Flood all boards of both sides from the border at once, through the squares without a wall of the side.
+
+        Returns a boolean array of shape ``(2, size, width, height)``, close territory of side A then side B.
+        """
+        passable = np.stack((self.walls != Owner.A, self.walls != Owner.B))
+        if self.height <= 64:
+            return passable & ~self.flood_rows(passable=passable)
+        outside = np.zeros_like(passable)
+        outside[:, :, 0, :] = passable[:, :, 0, :]
+        outside[:, :, -1, :] = passable[:, :, -1, :]
+        outside[:, :, :, 0] = passable[:, :, :, 0]
+        outside[:, :, :, -1] = passable[:, :, :, -1]
+        while True:
+            grown = outside.copy()
+            grown[:, :, 1:, :] |= outside[:, :, :-1, :]
+            grown[:, :, :-1, :] |= outside[:, :, 1:, :]
+            grown[:, :, :, 1:] |= outside[:, :, :, :-1]
+            grown[:, :, :, :-1] |= outside[:, :, :, 1:]
+            grown &= passable
+            if np.array_equal(grown, outside):
+                return passable & ~outside
+            outside = grown
+
+    def flood_rows(self, passable: np.ndarray) -> np.ndarray:
+        """Same flood as ``find_close_territory`` with every column ``x`` packed in one 64-bit mask of ``y``."""
+        bits = np.left_shift(np.uint64(1), np.arange(self.height, dtype=np.uint64))
+        row_passable = (passable * bits).sum(axis=-1, dtype=np.uint64)
+        border = np.uint64(1) | np.left_shift(np.uint64(1), np.uint64(self.height - 1))
+        outside = row_passable & border
+        outside[:, :, 0] = row_passable[:, :, 0]
+        outside[:, :, -1] = row_passable[:, :, -1]
+        one = np.uint64(1)
+        while True:
+            grown = outside | (outside << one) | (outside >> one)
+            grown[:, :, 1:] |= outside[:, :, :-1]
+            grown[:, :, :-1] |= outside[:, :, 1:]
+            grown &= row_passable
+            if np.array_equal(grown, outside):
+                return (outside[..., None] & bits) != 0
+            outside = grown
+
+    def calculate_point(self) -> np.ndarray:
+        """Return the points of side A and side B of every board as an array of shape ``(size, 2)``."""
+        is_castle = self.terrain == Terrain.CASTLE
+        points = []
+        for owner, flags in ((Owner.A, TerritoryFlag.CLOSE_A | TerritoryFlag.OPEN_A),
+                             (Owner.B, TerritoryFlag.CLOSE_B | TerritoryFlag.OPEN_B)):
+            territory = (self.territory & flags) != 0
+            points.append((self.walls == owner).sum(axis=(1, 2)) * self.wall_coeff
+                          + (territory & ~is_castle).sum(axis=(1, 2)) * self.territory_coeff
+                          + (territory & is_castle).sum(axis=(1, 2)) * self.castle_coeff)
+        return np.stack(points, axis=1)
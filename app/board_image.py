@@ -0,0 +1,140 @@
+from functools import lru_cache
+
+from PIL import Image, ImageColor, ImageDraw
+
+from app.board_state import BoardState
+from app.helpers import Owner, Terrain, TerritoryFlag, NEUTRAL_COLOR, POND_COLOR, WALL_A_COLOR, WALL_B_COLOR, \
+    CHOOSE_COLOR, GRID_COLOR, CLOSE_TERRITORY_A_COLOR, CLOSE_TERRITORY_B_COLOR, OPEN_TERRITORY_A_COLOR, \
+    OPEN_TERRITORY_B_COLOR
+from app.sprites import SPRITE_CACHE
+
+CASTLE_IMAGE_PATH = "./images/castle.png"
+CRAFTSMAN_IMAGE_PATHS = {
+    Owner.A: "./images/craftsmen_a.png",
+    Owner.B: "./images/craftsmen_b.png"
+}
+OWNER_COUNT = len(Owner)
+TERRITORY_COLORS = [
+    (TerritoryFlag.CLOSE_A, CLOSE_TERRITORY_A_COLOR),
+    (TerritoryFlag.CLOSE_B, CLOSE_TERRITORY_B_COLOR),
+    (TerritoryFlag.OPEN_A, OPEN_TERRITORY_A_COLOR),
+    (TerritoryFlag.OPEN_B, OPEN_TERRITORY_B_COLOR)
+]
+
+
+@lru_cache(maxsize=None)
+def get_rgb(color: str) -> (int, int, int):
+    return ImageColor.getrgb(color)
+
+
+def get_square_color(terrain: int, wall: int, flags: int) -> str:
+    if terrain == Terrain.POND:
+        return POND_COLOR
+    if wall == Owner.A:
+        return WALL_A_COLOR
+    if wall == Owner.B:
+        return WALL_B_COLOR
+    for flag, color in TERRITORY_COLORS:
+        if flags & flag:
+            return color
+    return NEUTRAL_COLOR
+
+
+def get_square_key(terrain: int, wall: int, flags: int) -> int:
+    return (terrain * OWNER_COUNT + wall) * 16 + flags
+
+
+# One palette entry per (terrain, wall, territory flags) of a square, the last one is the highlight colour.
+SQUARE_COLORS = [get_square_color(terrain=terrain, wall=wall, flags=flags)
+                 for terrain in range(len(Terrain)) for wall in range(len(Owner)) for flags in range(16)]
+HIGHLIGHT_KEY = len(SQUARE_COLORS)
+PALETTE = [channel for color in SQUARE_COLORS + [CHOOSE_COLOR] for channel in get_rgb(color)]
+
+
+class BoardImage:
+    """Pillow image of a whole board, one ``rect_width`` x ``rect_height`` square per square of the board.
+
+    It does not use tkinter, so boards can also be drawn without a display, in other processes.
+    """
+
+    def __init__(self, show_territory: bool = True):
+        self._show_territory: bool = show_territory
+        self._board: BoardState = None
+        self._rect_size: (int, int) = (0, 0)
+        self._draw: ImageDraw.ImageDraw = None
+        self._sprites: dict[str, Image.Image] = {}
+        self.image: Image.Image = None
+        self.highlighted: set[int] = set()
+
+    def render(self, board: BoardState, rect_width: int, rect_height: int) -> Image.Image:
+        self._board = board
+        if (rect_width, rect_height) != self._rect_size:
+            self._rect_size = (rect_width, rect_height)
+            self._sprites = {}
+
+        # Draw one palette pixel per square and scale it up, then add the grid and the images on top.
+        territory = board.territory if self._show_territory else bytes(len(board.territory))
+        keys = bytearray((terrain * OWNER_COUNT + wall) * 16 + flags
+                         for terrain, wall, flags in zip(board.terrain, board.walls, territory))
+        for index in self.highlighted:
+            keys[index] = HIGHLIGHT_KEY
+        # Squares are stored column by column, so the image is built transposed.
+        cells = Image.frombytes("P", (board.height, board.width), bytes(keys)).transpose(Image.TRANSPOSE)
+        cells.putpalette(PALETTE)
+        cells = cells.resize((board.width * rect_width, board.height * rect_height), Image.NEAREST).convert("RGB")
+        self.image = Image.new("RGB", (board.width * rect_width + 1, board.height * rect_height + 1), GRID_COLOR)
+        self.image.paste(cells)
+        self._draw = ImageDraw.Draw(self.image)
+        for column in range(board.width + 1):
+            self._draw.line([(column * rect_width, 0), (column * rect_width, board.height * rect_height)],
+                            fill=GRID_COLOR)
+        for row in range(board.height + 1):
+            self._draw.line([(0, row * rect_height), (board.width * rect_width, row * rect_height)], fill=GRID_COLOR)
+        castle = int(Terrain.CASTLE)
+        for index in [index for index, terrain in enumerate(board.terrain) if terrain == castle]:
+            self.draw_images(index=index)
+        for index in board.craftsman_positions:
+            if board.terrain[index] != castle:
+                self.draw_images(index=index)
+        return self.image
+
+    def get_color(self, index: int) -> str:
+        if index in self.highlighted:
+            return CHOOSE_COLOR
+        flags = self._board.territory[index] if self._show_territory else 0
+        return SQUARE_COLORS[get_square_key(terrain=self._board.terrain[index], wall=self._board.walls[index],
+                                            flags=flags)]
+
+    def draw_square(self, index: int):
+        (rect_width, rect_height) = self._rect_size
+        (x, y) = self._board.position(index=index)
+        x1 = x * rect_width
+        y1 = y * rect_height
+        self._draw.rectangle([x1, y1, x1 + rect_width, y1 + rect_height], fill=self.get_color(index=index),
+                             outline=GRID_COLOR)
+        self.draw_images(index=index)
+
+    def get_square_box(self, index: int) -> (int, int, int, int):
+        """Return the pixels of one square with its grid lines, as a ``(left, top, right, bottom)`` box."""
+        (rect_width, rect_height) = self._rect_size
+        (x, y) = self._board.position(index=index)
+        return x * rect_width, y * rect_height, (x + 1) * rect_width + 1, (y + 1) * rect_height + 1
+
+    def draw_images(self, index: int):
+        (x, y) = self._board.position(index=index)
+        # Images stay inside the grid lines, so drawing one square again never changes its neighbors.
+        position = (x * self._rect_size[0] + 1, y * self._rect_size[1] + 1)
+        if self._board.terrain[index] == Terrain.CASTLE:
+            sprite = self.get_sprite(image_path=CASTLE_IMAGE_PATH)
+            self.image.paste(sprite, position, sprite)
+        craftsman = self._board.occupancy[index]
+        if craftsman >= 0:
+            sprite = self.get_sprite(image_path=CRAFTSMAN_IMAGE_PATHS[self._board.craftsman_sides[craftsman]])
+            self.image.paste(sprite, position, sprite)
+
+    def get_sprite(self, image_path: str) -> Image.Image:
+        if image_path not in self._sprites:
+            (rect_width, rect_height) = self._rect_size
+            self._sprites[image_path] = SPRITE_CACHE.get_image(image_path=image_path).convert("RGBA").resize(
+                (max(1, rect_width - 1), max(1, rect_height - 1)))
+        return self._sprites[image_path]
@@ -0,0 +1,352 @@
+import copy
+from array import array
+from collections import Counter, deque
+
+from app.helpers import Side, ActionType, Terrain, Owner, TerritoryFlag, MOVE_OFFSETS, BUILD_AND_DESTROY_OFFSETS
+from app.models import GameResp, GameActionsResp
+from app.territory import Territory
+from app.zobrist import ZobristKeys, get_zobrist_keys
+
+TERRITORY_A = bytes(1 if flag & (TerritoryFlag.CLOSE_A | TerritoryFlag.OPEN_A) else 0 for flag in range(256))
+TERRITORY_B = bytes(1 if flag & (TerritoryFlag.CLOSE_B | TerritoryFlag.OPEN_B) else 0 for flag in range(256))
+SHARED_FIELDS = ('walls', 'territory', 'craftsman_ids', 'craftsman_sides', 'craftsman_positions', 'occupancy',
+                 '_craftsman_index', '_territory_a', '_territory_b', '_changed_walls', '_wall_count',
+                 '_territory_count', '_castle_count')
+UNDO_LIMIT = 64
+CHANGE_WALL = 0
+CHANGE_TERRITORY = 1
+CHANGE_POSITION = 2
+CHANGE_TURN = 3
+
+
+class PointDetail:
+    def __init__(self, wall: int, territory: int, castle: int):
+        self.wall: int = wall
+        self.territory: int = territory
+        self.castle: int = castle
+
+    @property
+    def total(self) -> int:
+        return self.wall + self.territory + self.castle
+
+
+class BoardState:
+    """Game state of a map without any tkinter object.
+
+    Every square is stored as one byte in each of ``terrain``, ``walls`` and ``territory``, indexed by
+    ``x * height + y``. Craftsmen are stored as parallel arrays of id, side and square index.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width: int = width
+        self.height: int = height
+        self.terrain: bytearray = bytearray(width * height)
+        self.walls: bytearray = bytearray(width * height)
+        self.territory: bytearray = bytearray(width * height)
+        self.craftsman_ids: list[str] = []
+        self.craftsman_sides: bytearray = bytearray()
+        self.craftsman_positions: array = array('i')
+        self.occupancy: array = array('i', [-1]) * (width * height)
+        self._craftsman_index: dict[str, int] = {}
+        self.castle_coeff: int = 0
+        self.territory_coeff: int = 0
+        self.wall_coeff: int = 0
+        self.turn: int = 0
+        self.hash: int = 0
+        self._zobrist: ZobristKeys = get_zobrist_keys(width=width, height=height)
+        self._territory_a: Territory = Territory(width=width, height=height)
+        self._territory_b: Territory = Territory(width=width, height=height)
+        self._territory_a.update(walls=self.walls)
+        self._territory_b.update(walls=self.walls)
+        self._changed_walls: list[int] = []
+        self._wall_count: list[int] = [width * height, 0, 0]
+        self._territory_count: list[int] = [0, 0, 0]
+        self._castle_count: list[int] = [0, 0, 0]
+        self._shared: set[str] = set()
+        self._journal: deque = deque(maxlen=UNDO_LIMIT)
+        self._current_changes: list[tuple] = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state['_zobrist']
+        state['_shared'] = set()
+        state['_journal'] = deque(maxlen=UNDO_LIMIT)
+        state['_current_changes'] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._zobrist = get_zobrist_keys(width=self.width, height=self.height)
+
+    def fork(self) -> 'BoardState':
+        """Return a copy that shares every array with this board until one of them changes it.
+
+        The fork starts with an empty undo history.
+        """
+        board = copy.copy(self)
+        board._journal = deque(maxlen=UNDO_LIMIT)
+        board._current_changes = None
+        board._shared = set(SHARED_FIELDS)
+        self._shared = set(SHARED_FIELDS)
+        return board
+
+    def writable(self, name: str):
+        """Return the field ``name``, copying it first if it is still shared with a fork."""
+        value = getattr(self, name)
+        if name in self._shared:
+            self._shared.discard(name)
+            value = value.copy() if isinstance(value, Territory) else copy.copy(value)
+            setattr(self, name, value)
+        return value
+
+    def copy(self) -> 'BoardState':
+        board = copy.copy(self)
+        board._shared = set()
+        board._journal = deque(maxlen=UNDO_LIMIT)
+        board._current_changes = None
+        board.walls = bytearray(self.walls)
+        board.territory = bytearray(self.territory)
+        board.craftsman_ids = list(self.craftsman_ids)
+        board.craftsman_sides = bytearray(self.craftsman_sides)
+        board.craftsman_positions = array('i', self.craftsman_positions)
+        board.occupancy = array('i', self.occupancy)
+        board._craftsman_index = dict(self._craftsman_index)
+        board._territory_a = self._territory_a.copy()
+        board._territory_b = self._territory_b.copy()
+        board._changed_walls = list(self._changed_walls)
+        board._wall_count = list(self._wall_count)
+        board._territory_count = list(self._territory_count)
+        board._castle_count = list(self._castle_count)
+        return board
+
+    def load_field(self, field: GameResp.Field):
+        if field is None:
+            return
+        self.castle_coeff = field.castle_coeff
+        self.territory_coeff = field.territory_coeff
+        self.wall_coeff = field.wall_coeff
+        for castle in field.castles:
+            self.terrain[self.index(x=castle.x, y=castle.y)] = Terrain.CASTLE
+        for pond in field.ponds:
+            self.terrain[self.index(x=pond.x, y=pond.y)] = Terrain.POND
+        for craftsman in field.craftsmen:
+            self.add_craftsman(craftsman_id=craftsman.id, side=craftsman.side,
+                               index=self.index(x=craftsman.x, y=craftsman.y))
+
+    def add_craftsman(self, craftsman_id: str, side: Side, index: int):
+        self.writable('_craftsman_index')[craftsman_id] = len(self.craftsman_ids)
+        self.writable('occupancy')[index] = len(self.craftsman_ids)
+        self.writable('craftsman_ids').append(craftsman_id)
+        self.writable('craftsman_sides').append(Owner.A if side == Side.A else Owner.B)
+        self.writable('craftsman_positions').append(index)
+        self.hash ^= self._zobrist.get_craftsman_keys(craftsman=len(self.craftsman_ids) - 1)[index]
+
+    def index(self, x: int, y: int) -> int:
+        return x * self.height + y
+
+    def position(self, index: int) -> (int, int):
+        return divmod(index, self.height)
+
+    def target_index(self, index: int, offset: (int, int)) -> int:
+        (x, y) = self.position(index=index)
+        x += offset[0]
+        y += offset[1]
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.index(x=x, y=y)
+        return -1
+
+    def find_craftsman(self, craftsman_id: str) -> int:
+        return self._craftsman_index.get(craftsman_id, -1)
+
+    def has_craftsman(self, index: int) -> bool:
+        return self.occupancy[index] >= 0
+
+    def apply_turn(self, actions: list[GameActionsResp.ChildAction], turn: int) -> list[int]:
+        """Apply all actions of one turn at the same time and return the squares whose wall changed.
+
+        Destroy actions are applied first, then build actions, then move actions, the same order as
+        ``MapController.create_map_from_server``. Moves are checked against the positions at the start of the
+        move phase and every move into a square targeted by another craftsman is cancelled, so the result
+        does not depend on the order of ``actions``. Builds of both sides on the same square are cancelled
+        for the same reason. Only the last action of each craftsman is used.
+        """
+        latest_actions = {}
+        for child_action in actions:
+            craftsman = self.find_craftsman(craftsman_id=child_action.craftsman_id)
+            if craftsman >= 0:
+                latest_actions[craftsman] = (child_action.action, child_action.action_param)
+        return self.resolve_turn(actions=latest_actions, turn=turn)
+
+    def resolve_turn(self, actions: dict[int, tuple], turn: int) -> list[int]:
+        """Same as ``apply_turn`` with one ``(ActionType, action_param)`` pair per craftsman number.
+
+        The changes of the turn, including the next ``update_territory``, are recorded for ``undo``.
+        """
+        self._current_changes = []
+        self._journal.append(self._current_changes)
+        changed = []
+        for craftsman, (action, action_param) in actions.items():
+            if action == ActionType.DESTROY:
+                target = self.target_index(index=self.craftsman_positions[craftsman],
+                                           offset=BUILD_AND_DESTROY_OFFSETS.get(action_param))
+                if target >= 0 and self.walls[target] != Owner.NONE:
+                    self.set_wall(index=target, wall=Owner.NONE)
+                    changed.append(target)
+        builders = {}
+        for craftsman, (action, action_param) in actions.items():
+            if action == ActionType.BUILD:
+                target = self.target_index(index=self.craftsman_positions[craftsman],
+                                           offset=BUILD_AND_DESTROY_OFFSETS.get(action_param))
+                builders.setdefault(target, set()).add(self.craftsman_sides[craftsman])
+        for target, sides in builders.items():
+            if len(sides) == 1 and self.can_build(target=target):
+                self.set_wall(index=target, wall=sides.pop())
+                changed.append(target)
+
+        moves = {}
+        for craftsman, (action, action_param) in actions.items():
+            if action == ActionType.MOVE:
+                target = self.target_index(index=self.craftsman_positions[craftsman],
+                                           offset=MOVE_OFFSETS.get(action_param))
+                if self.can_move(craftsman=craftsman, target=target):
+                    moves[craftsman] = target
+        target_count = Counter(moves.values())
+        for craftsman, target in moves.items():
+            if target_count[target] == 1:
+                self.set_craftsman_position(craftsman=craftsman, index=target)
+
+        self.set_turn(turn=turn)
+        return changed
+
+    def set_turn(self, turn: int):
+        self.record(kind=CHANGE_TURN, key=0, value=self.turn)
+        if (turn - self.turn) % 2:
+            self.hash ^= self._zobrist.side
+        self.turn = turn
+
+    def can_move(self, craftsman: int, target: int) -> bool:
+        if target < 0 or self.has_craftsman(index=target) or self.terrain[target] == Terrain.POND:
+            return False
+        wall = self.walls[target]
+        return wall == Owner.NONE or wall == self.craftsman_sides[craftsman]
+
+    def set_craftsman_position(self, craftsman: int, index: int):
+        keys = self._zobrist.get_craftsman_keys(craftsman=craftsman)
+        self.hash ^= keys[self.craftsman_positions[craftsman]] ^ keys[index]
+        self.record(kind=CHANGE_POSITION, key=craftsman, value=self.craftsman_positions[craftsman])
+        occupancy = self.writable('occupancy')
+        occupancy[self.craftsman_positions[craftsman]] = -1
+        occupancy[index] = craftsman
+        self.writable('craftsman_positions')[craftsman] = index
+
+    def can_build(self, target: int) -> bool:
+        return target >= 0 and not self.has_craftsman(index=target) and self.terrain[target] == Terrain.NEUTRAL \
+            and self.walls[target] == Owner.NONE
+
+    def set_wall(self, index: int, wall: int):
+        self.record(kind=CHANGE_WALL, key=index, value=self.walls[index])
+        self.change_wall(index=index, wall=wall)
+        # A new wall starts without territory, the same as the new WallA/WallB/Neutral object in Map._point.
+        self.set_territory(index=index, flags=TerritoryFlag.NONE)
+        self.writable('_changed_walls').append(index)
+
+    def change_wall(self, index: int, wall: int):
+        wall_count = self.writable('_wall_count')
+        wall_count[self.walls[index]] -= 1
+        wall_count[wall] += 1
+        self.hash ^= self._zobrist.walls[self.walls[index]][index] ^ self._zobrist.walls[wall][index]
+        self.writable('walls')[index] = wall
+
+    def set_territory(self, index: int, flags: int):
+        old_flags = self.territory[index]
+        if flags == old_flags:
+            return
+        self.record(kind=CHANGE_TERRITORY, key=index, value=old_flags)
+        counter = self.writable('_castle_count' if self.terrain[index] == Terrain.CASTLE else '_territory_count')
+        counter[Owner.A] += TERRITORY_A[flags] - TERRITORY_A[old_flags]
+        counter[Owner.B] += TERRITORY_B[flags] - TERRITORY_B[old_flags]
+        self.hash ^= self._zobrist.get_territory_key(index=index, flags=flags ^ old_flags)
+        self.writable('territory')[index] = flags
+
+    def record(self, kind: int, key: int, value: int):
+        if self._current_changes is not None:
+            self._current_changes.append((kind, key, value))
+
+    def undo(self) -> bool:
+        """Revert the last turn applied by ``resolve_turn`` and its territory update, in O(changes)."""
+        if not self._journal:
+            return False
+        changes = self._journal.pop()
+        self._current_changes = None
+        for kind, key, value in reversed(changes):
+            if kind == CHANGE_WALL:
+                self.change_wall(index=key, wall=value)
+                (x, y) = divmod(key, self.height)
+                self.writable('_territory_a').set_wall(x=x, y=y, is_wall=value == Owner.A)
+                self.writable('_territory_b').set_wall(x=x, y=y, is_wall=value == Owner.B)
+            elif kind == CHANGE_TERRITORY:
+                self.set_territory(index=key, flags=value)
+            elif kind == CHANGE_POSITION:
+                self.set_craftsman_position(craftsman=key, index=value)
+            else:
+                self.set_turn(turn=value)
+        return True
+
+    def compute_hash(self) -> int:
+        """Zobrist hash of walls by side, territory flags, craftsman positions and the side to move.
+
+        ``hash`` is kept equal to this value on every change. Territory flags are part of the hash because open
+        territory depends on the history, so two states with the same hash also have the same points.
+        """
+        value = self._zobrist.side if self.turn % 2 else 0
+        for index in range(self.width * self.height):
+            value ^= self._zobrist.walls[self.walls[index]][index]
+            value ^= self._zobrist.get_territory_key(index=index, flags=self.territory[index])
+        for craftsman, index in enumerate(self.craftsman_positions):
+            value ^= self._zobrist.get_craftsman_keys(craftsman=craftsman)[index]
+        return value
+
+    def update_territory(self) -> set[int]:
+        """Update territory around the walls changed since the last call and return the changed squares."""
+        changed = set()
+        height = self.height
+        if self._changed_walls:
+            territory_a = self.writable('_territory_a')
+            territory_b = self.writable('_territory_b')
+            for index in self._changed_walls:
+                changed.add(index)
+                (x, y) = divmod(index, height)
+                changed.update(territory_a.set_wall(x=x, y=y, is_wall=self.walls[index] == Owner.A))
+                changed.update(territory_b.set_wall(x=x, y=y, is_wall=self.walls[index] == Owner.B))
+            self._changed_walls = []
+            self._shared.discard('_changed_walls')
+        for index in changed:
+            (x, y) = divmod(index, height)
+            self.set_territory(index=index, flags=self.change_territory_status(
+                flags=self.territory[index],
+                is_close_territory_a=self._territory_a.is_close(x=x, y=y),
+                is_close_territory_b=self._territory_b.is_close(x=x, y=y)))
+        return changed
+
+    @staticmethod
+    def change_territory_status(flags: int, is_close_territory_a: bool, is_close_territory_b: bool) -> int:
+        if is_close_territory_a and is_close_territory_b:
+            return TerritoryFlag.CLOSE_A | TerritoryFlag.CLOSE_B
+        if is_close_territory_a:
+            return TerritoryFlag.CLOSE_A
+        if is_close_territory_b:
+            return TerritoryFlag.CLOSE_B
+        if flags & TerritoryFlag.CLOSE_A:
+            return TerritoryFlag.OPEN_A
+        if flags & TerritoryFlag.CLOSE_B:
+            return TerritoryFlag.OPEN_B
+        return flags
+
+    def calculate_point(self) -> (int, int):
+        return self.calculate_point_detail(side=Side.A).total, self.calculate_point_detail(side=Side.B).total
+
+    def calculate_point_detail(self, side: Side) -> PointDetail:
+        owner = Owner.A if side == Side.A else Owner.B
+        return PointDetail(wall=self._wall_count[owner] * self.wall_coeff,
+                           territory=self._territory_count[owner] * self.territory_coeff,
+                           castle=self._castle_count[owner] * self.castle_coeff)
@@ -0,0 +1,73 @@
+MIN_RECT_SIZE = 8
+MAX_RECT_SIZE = 128
+ZOOM_STEP = 1.25
+VIEWPORT_MARGIN = 2
+
+
+class Camera:
+    """Size of the squares on screen and the part of the map shown in the canvas.
+
+    The squares are never smaller than ``MIN_RECT_SIZE``, a map that does not fit in the canvas at that size is
+    panned instead. Offsets are in pixels from the top left corner of the map.
+    """
+
+    def __init__(self, width: int, height: int, max_rect_size: int = MAX_RECT_SIZE):
+        self._width: int = width
+        self._height: int = height
+        self._max_rect_size: int = max(MIN_RECT_SIZE, max_rect_size)
+        self.rect_width: int = 0
+        self.rect_height: int = 0
+        self.offset_x: int = 0
+        self.offset_y: int = 0
+        self.viewport_width: int = 0
+        self.viewport_height: int = 0
+
+    @property
+    def state(self) -> (int, int, int, int):
+        return self.rect_width, self.rect_height, self.offset_x, self.offset_y
+
+    def fit(self, viewport_width: int, viewport_height: int):
+        """Make the whole map fit in the viewport, as far as the minimum square size allows."""
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.rect_width = self.clamp_rect_size(size=int(viewport_width / self._width))
+        self.rect_height = self.clamp_rect_size(size=int(viewport_height / self._height))
+        self.move_to(offset_x=self.offset_x, offset_y=self.offset_y)
+
+    def zoom(self, factor: float, anchor_x: int, anchor_y: int):
+        """Scale the squares by ``factor`` keeping the point under (``anchor_x``, ``anchor_y``) in place."""
+        rect_width = self.clamp_rect_size(size=round(self.rect_width * factor))
+        rect_height = self.clamp_rect_size(size=round(self.rect_height * factor))
+        if self.rect_width <= 0 or self.rect_height <= 0:
+            return
+        offset_x = (anchor_x + self.offset_x) * rect_width / self.rect_width - anchor_x
+        offset_y = (anchor_y + self.offset_y) * rect_height / self.rect_height - anchor_y
+        (self.rect_width, self.rect_height) = (rect_width, rect_height)
+        self.move_to(offset_x=int(offset_x), offset_y=int(offset_y))
+
+    def pan(self, dx: int, dy: int):
+        self.move_to(offset_x=self.offset_x + dx, offset_y=self.offset_y + dy)
+
+    def move_to(self, offset_x: int, offset_y: int):
+        max_offset_x = max(0, self._width * self.rect_width - self.viewport_width)
+        max_offset_y = max(0, self._height * self.rect_height - self.viewport_height)
+        self.offset_x = min(max(0, offset_x), max_offset_x)
+        self.offset_y = min(max(0, offset_y), max_offset_y)
+
+    def clamp_rect_size(self, size: int) -> int:
+        return min(max(MIN_RECT_SIZE, size), self._max_rect_size)
+
+    def get_square_coords(self, x: int, y: int) -> (int, int, int, int):
+        x1 = x * self.rect_width - self.offset_x
+        y1 = y * self.rect_height - self.offset_y
+        return x1, y1, x1 + self.rect_width, y1 + self.rect_height
+
+    def get_visible_range(self, margin: int = VIEWPORT_MARGIN) -> (int, int, int, int):
+        """Return the squares ``x1 <= x < x2`` and ``y1 <= y < y2`` inside the viewport plus ``margin`` squares."""
+        if self.rect_width <= 0 or self.rect_height <= 0:
+            return 0, 0, 0, 0
+        x1 = max(0, self.offset_x // self.rect_width - margin)
+        y1 = max(0, self.offset_y // self.rect_height - margin)
+        x2 = min(self._width, (self.offset_x + self.viewport_width) // self.rect_width + 1 + margin)
+        y2 = min(self._height, (self.offset_y + self.viewport_height) // self.rect_height + 1 + margin)
+        return x1, y1, x2, y2
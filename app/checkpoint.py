@@ -0,0 +1,99 @@
+import hashlib
+import os
+import pickle
+from typing import List, Optional
+
+from app.board_state import BoardState
+from app.models import GameResp, GameActionsResp
+from app.simulator import create_board, apply_turn, latest_actions_by_turn
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ''))
+CHECKPOINT_DIR = os.path.join(BASE_DIR, '../.checkpoints')
+CHECKPOINT_INTERVAL = 10
+
+
+class CheckpointStore:
+    """Boards rebuilt from the action history, saved every ``interval`` turns in memory and on disk.
+
+    Every checkpoint keeps a digest chained over the field and the actions of every turn up to it, so a
+    checkpoint is only used while the history it was built from is still the same.
+    """
+
+    def __init__(self, game_id: str, interval: int = CHECKPOINT_INTERVAL, directory: str = CHECKPOINT_DIR):
+        self._interval: int = interval
+        self._directory: str = os.path.join(directory, str(game_id))
+        self._checkpoints: dict[int, (str, BoardState)] = {}
+
+    def rebuild(self, field: GameResp.Field, list_actions: List[GameActionsResp], turn: int) -> BoardState:
+        """Return the board at ``turn``, starting from the latest valid checkpoint."""
+        turn_actions = latest_actions_by_turn(list_actions=list_actions, turn=turn)
+        digests = self.get_digests(field=field, turn_actions=turn_actions)
+        start = 0
+        board = None
+        for i in range(len(turn_actions) - 1, -1, -1):
+            if turn_actions[i].turn % self._interval == 0:
+                board = self.load(turn=turn_actions[i].turn, digest=digests[i])
+                if board is not None:
+                    start = i + 1
+                    break
+        if board is None:
+            board = create_board(field=field)
+        for i in range(start, len(turn_actions)):
+            apply_turn(board=board, actions=turn_actions[i])
+            if turn_actions[i].turn % self._interval == 0:
+                self.save(board=board, digest=digests[i])
+        return board
+
+    def is_due(self, turn: int) -> bool:
+        return turn % self._interval == 0 and turn not in self._checkpoints
+
+    def save_if_due(self, board: BoardState, field: GameResp.Field, list_actions: List[GameActionsResp]):
+        """Save ``board`` when its turn is due, only if it was built from ``field``."""
+        if not self.is_due(turn=board.turn) or not self.is_board_of(board=board, field=field):
+            return
+        turn_actions = latest_actions_by_turn(list_actions=list_actions, turn=board.turn)
+        if turn_actions and turn_actions[-1].turn == board.turn:
+            self.save(board=board, digest=self.get_digests(field=field, turn_actions=turn_actions)[-1])
+
+    @staticmethod
+    def is_board_of(board: BoardState, field: GameResp.Field) -> bool:
+        """Whether ``board`` has the size, terrain and craftsmen of ``field``."""
+        if (board.width, board.height) != (field.width, field.height):
+            return False
+        return board.craftsman_ids == [craftsman.id for craftsman in field.craftsmen] \
+            and board.terrain == create_board(field=field).terrain
+
+    @staticmethod
+    def get_digests(field: GameResp.Field, turn_actions: List[GameActionsResp]) -> list[str]:
+        digest = hashlib.sha1(field.json(sort_keys=True).encode())
+        digests = []
+        for actions in turn_actions:
+            digest.update(actions.json(include={'turn', 'actions'}, sort_keys=True).encode())
+            digests.append(digest.hexdigest())
+        return digests
+
+    def save(self, board: BoardState, digest: str):
+        self._checkpoints[board.turn] = (digest, board.fork())
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            path = self.get_path(turn=board.turn)
+            with open(path + '.tmp', 'wb') as file:
+                pickle.dump((digest, board), file)
+            os.replace(path + '.tmp', path)
+        except OSError:
+            pass
+
+    def load(self, turn: int, digest: str) -> Optional[BoardState]:
+        if turn not in self._checkpoints:
+            try:
+                with open(self.get_path(turn=turn), 'rb') as file:
+                    self._checkpoints[turn] = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+                return None
+        (saved_digest, board) = self._checkpoints[turn]
+        if saved_digest != digest:
+            return None
+        return board.fork()
+
+    def get_path(self, turn: int) -> str:
+        return os.path.join(self._directory, f"turn_{turn}.pkl")
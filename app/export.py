@@ -0,0 +1,97 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw
+
+from app.action_log import ActionLog
+from app.board_image import BoardImage
+from app.board_state import BoardState
+from app.models import GameActionsResp
+from app.services import Service
+from app.simulator import create_board, apply_turn
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ''))
+load_dotenv(os.path.join(BASE_DIR, '../.env'))
+
+EXPORT_RECT_SIZE = 32
+SCORE_HEIGHT = 20
+SCORE_COLOR = 'black'
+SCORE_BACKGROUND_COLOR = 'white'
+
+
+def render_frame(board: BoardState, board_image: BoardImage, rect_size: int, show_score: bool) -> Image.Image:
+    image = board_image.render(board=board, rect_width=rect_size, rect_height=rect_size)
+    if not show_score:
+        return image
+    frame = Image.new("RGB", (image.width, image.height + SCORE_HEIGHT), SCORE_BACKGROUND_COLOR)
+    frame.paste(image)
+    (point_a, point_b) = board.calculate_point()
+    ImageDraw.Draw(frame).text((4, image.height + 4), f"Turn: {board.turn} A:{point_a} B:{point_b}",
+                               fill=SCORE_COLOR)
+    return frame
+
+
+def export_turns(board: BoardState, turn_actions: list[GameActionsResp], directory: str, rect_size: int,
+                 show_territory: bool, show_score: bool) -> list[str]:
+    """Save the frame of every turn in ``turn_actions``, starting from ``board`` before the first of them."""
+    board_image = BoardImage(show_territory=show_territory)
+    paths = []
+    for actions in turn_actions:
+        apply_turn(board=board, actions=actions)
+        path = os.path.join(directory, f"turn_{actions.turn:04d}.png")
+        render_frame(board=board, board_image=board_image, rect_size=rect_size, show_score=show_score).save(path)
+        paths.append(path)
+    return paths
+
+
+def export_match(game_id: str, directory: str, rect_size: int = EXPORT_RECT_SIZE, show_territory: bool = True,
+                 show_score: bool = True, processes: int = None) -> list[str]:
+    """Save one PNG per turn of the match, the turns are split in chunks rendered by a process pool."""
+    os.environ['GAME_ID'] = str(game_id)
+    services = Service()
+    field = services.get_game_with_game_id().field
+    action_log = ActionLog()
+    action_log.add(list_actions=services.get_game_actions_with_game_id())
+    last_turn = max(action_log.latest_turn or 0, services.get_game_status_with_game_id().cur_turn or 0)
+    # Turns without actions still get a frame, the board only moves to the next turn.
+    turn_actions = [action_log.get_latest_actions(turn=turn) or GameActionsResp(turn=turn, actions=[])
+                    for turn in range(1, last_turn + 1)]
+
+    os.makedirs(directory, exist_ok=True)
+    board = create_board(field=field)
+    path = os.path.join(directory, f"turn_{0:04d}.png")
+    render_frame(board=board, board_image=BoardImage(show_territory=show_territory), rect_size=rect_size,
+                 show_score=show_score).save(path)
+    paths = [path]
+
+    # Replaying is much cheaper than drawing, so the boards at the start of every chunk are computed here.
+    processes = processes or os.cpu_count() or 1
+    chunk_size = max(1, -(-len(turn_actions) // processes))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = []
+        for start in range(0, len(turn_actions), chunk_size):
+            chunk = turn_actions[start:start + chunk_size]
+            futures.append(executor.submit(export_turns, board.copy(), chunk, directory, rect_size,
+                                           show_territory, show_score))
+            for actions in chunk:
+                apply_turn(board=board, actions=actions)
+        for future in futures:
+            paths.extend(future.result())
+    return paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export every turn of a match to PNG images.")
+    parser.add_argument('--game-id', default=os.getenv('GAME_ID', 0))
+    parser.add_argument('--output', default='frames')
+    parser.add_argument('--rect-size', type=int, default=EXPORT_RECT_SIZE)
+    parser.add_argument('--no-territory', action='store_true')
+    parser.add_argument('--no-score', action='store_true')
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+    exported = export_match(game_id=args.game_id, directory=args.output, rect_size=args.rect_size,
+                            show_territory=not args.no_territory, show_score=not args.no_score,
+                            processes=args.processes)
+    print(f"Exported {len(exported)} frames to {args.output}")
@@ -1,8 +1,18 @@
-from enum import Enum, IntEnum
+from enum import Enum, IntEnum, IntFlag
 
 INIT_WIDTH = 1100
 INIT_HEIGHT = 800
 INFO_BOARD_WIDTH = 300
+PLAN_SAFETY_MARGIN = 1
+PLAN_MIN_TIME = 0.5
+SUBMIT_SAFETY_MARGIN = 0.5
+RESIZE_INTERVAL = 16
+NETWORK_DRAIN_INTERVAL = 16
+STATUS_REQUEST = "status"
+SNAPSHOT_REQUEST = "snapshot"
+ACTIONS_REQUEST = "actions"
+REBUILD_REQUEST = "rebuild"
+CHECKPOINT_REQUEST = "checkpoint"
 
 NEUTRAL_COLOR = "white"
 POND_COLOR = "black"
@@ -10,6 +20,27 @@ BORDER_COLOR = 'red'
 CHOOSE_COLOR = 'yellow'
 WALL_A_COLOR = '#ADD8E6'
 WALL_B_COLOR = 'pink'
+GRID_COLOR = 'black'
+CLOSE_TERRITORY_A_COLOR = '#D0E8F0'
+CLOSE_TERRITORY_B_COLOR = '#F8D8E0'
+OPEN_TERRITORY_A_COLOR = '#EAF5F8'
+OPEN_TERRITORY_B_COLOR = '#FCEEF2'
+TERRITORY_A_COLOR = '#4682B4'
+TERRITORY_B_COLOR = '#C71585'
+CLOSE_TERRITORY_STIPPLE = 'gray50'
+OPEN_TERRITORY_STIPPLE = 'gray12'
+
+MAP_TAG = "map"
+NEUTRAL_TAG = "neutral"
+POND_TAG = "pond"
+CASTLE_TAG = "castle"
+WALL_A_TAG = "wall_a"
+WALL_B_TAG = "wall_b"
+CRAFTSMAN_TAG = "craftsman"
+BORDER_TAG = "border"
+LABEL_TAG = "label"
+TERRITORY_TAG = "territory"
+BOARD_IMAGE_TAG = "board_image"
 
 
 class ActionType(str, Enum):
@@ -46,3 +77,52 @@ class State(IntEnum):
     WAITING = 0
     CHOOSE_ACTION = 1
     CHOOSE_DIRECTION = 2
+
+
+class RenderMode(str, Enum):
+    CANVAS = "canvas"
+    RASTER = "raster"
+
+
+class Terrain(IntEnum):
+    NEUTRAL = 0
+    POND = 1
+    CASTLE = 2
+
+
+class Owner(IntEnum):
+    NONE = 0
+    A = 1
+    B = 2
+
+
+class TerritoryFlag(IntFlag):
+    NONE = 0
+    CLOSE_A = 1
+    CLOSE_B = 2
+    OPEN_A = 4
+    OPEN_B = 8
+
+
+MOVE_OFFSETS = {
+    MoveType.UPPER_LEFT: (-1, -1),
+    MoveType.LEFT: (-1, 0),
+    MoveType.LOWER_LEFT: (-1, 1),
+    MoveType.UP: (0, -1),
+    MoveType.DOWN: (0, 1),
+    MoveType.UPPER_RIGHT: (1, -1),
+    MoveType.RIGHT: (1, 0),
+    MoveType.LOWER_RIGHT: (1, 1)
+}
+
+BUILD_AND_DESTROY_OFFSETS = {
+    BuildAndDestroyType.LEFT: (-1, 0),
+    BuildAndDestroyType.RIGHT: (1, 0),
+    BuildAndDestroyType.ABOVE: (0, -1),
+    BuildAndDestroyType.BELOW: (0, 1)
+}
+
+ACTION_LIST = [(ActionType.STAY, None)] \
+    + [(ActionType.MOVE, move_type) for move_type in MOVE_OFFSETS] \
+    + [(ActionType.BUILD, build_type) for build_type in BUILD_AND_DESTROY_OFFSETS] \
+    + [(ActionType.DESTROY, destroy_type) for destroy_type in BUILD_AND_DESTROY_OFFSETS]
@@ -0,0 +1,64 @@
+from array import array
+from functools import lru_cache
+from typing import List
+
+from app.board_state import BoardState
+from app.helpers import ActionType, Owner, Side, ACTION_LIST, MOVE_OFFSETS, BUILD_AND_DESTROY_OFFSETS
+from app.models import GameActionsReq
+
+ACTION_INDEX = {action: i for i, action in enumerate(ACTION_LIST)}
+
+
+@lru_cache(maxsize=8)
+def get_neighbor_table(width: int, height: int) -> list[array]:
+    """Return the target square of every action of ``ACTION_LIST`` from every square, -1 when off the map."""
+    table = []
+    for (action, param) in ACTION_LIST:
+        if action == ActionType.STAY:
+            (dx, dy) = (0, 0)
+        elif action == ActionType.MOVE:
+            (dx, dy) = MOVE_OFFSETS[param]
+        else:
+            (dx, dy) = BUILD_AND_DESTROY_OFFSETS[param]
+        targets = array('i', [-1]) * (width * height)
+        for x in range(max(0, -dx), min(width, width - dx)):
+            for y in range(max(0, -dy), min(height, height - dy)):
+                targets[x * height + y] = (x + dx) * height + y + dy
+        table.append(targets)
+    return table
+
+
+def get_legal_action_mask(board: BoardState, craftsman: int) -> list[bool]:
+    """Return one flag per action of ``ACTION_LIST``: stay, 8 moves, 4 builds then 4 destroys."""
+    table = get_neighbor_table(width=board.width, height=board.height)
+    position = board.craftsman_positions[craftsman]
+    mask = []
+    for (action, _), targets in zip(ACTION_LIST, table):
+        target = targets[position]
+        if action == ActionType.STAY:
+            mask.append(True)
+        elif action == ActionType.MOVE:
+            mask.append(board.can_move(craftsman=craftsman, target=target))
+        elif action == ActionType.BUILD:
+            mask.append(board.can_build(target=target))
+        else:
+            mask.append(target >= 0 and board.walls[target] != Owner.NONE)
+    return mask
+
+
+def get_legal_action_indexes(board: BoardState, craftsman: int) -> list[int]:
+    return [i for i, is_legal in enumerate(get_legal_action_mask(board=board, craftsman=craftsman)) if is_legal]
+
+
+def find_illegal_actions(board: BoardState, side: Side,
+                         actions: List[GameActionsReq.ChildAction]) -> List[GameActionsReq.ChildAction]:
+    owner = Owner.A if side == Side.A else Owner.B
+    illegal_actions = []
+    for child_action in actions:
+        craftsman = board.find_craftsman(craftsman_id=child_action.craftsman_id)
+        action_param = None if child_action.action == ActionType.STAY else child_action.action_param
+        action_index = ACTION_INDEX.get((child_action.action, action_param))
+        if craftsman < 0 or board.craftsman_sides[craftsman] != owner or action_index is None \
+                or not get_legal_action_mask(board=board, craftsman=craftsman)[action_index]:
+            illegal_actions.append(child_action)
+    return illegal_actions
@@ -1,16 +1,29 @@
 import os
 import tkinter as tk
 
-from helpers import INIT_WIDTH, INIT_HEIGHT, INFO_BOARD_WIDTH
+from app.helpers import INIT_WIDTH, INIT_HEIGHT, INFO_BOARD_WIDTH
 from map_controller import MapController
 
 
 def resize(event):
-    window_width = window.winfo_width()
-    window_height = window.winfo_height()
-    frame.config(width=window_width, height=window_height)
-    canvas.config(width=window_width - INFO_BOARD_WIDTH, height=window_height)
-    map_controller.resize()
+    map_controller.request_resize()
+
+
+def mouse_wheel(event):
+    map_controller.zoom(zoom_in=event.num == 4 or event.delta > 0, x=event.x, y=event.y)
+
+
+def start_pan(event):
+    map_controller.start_pan(x=event.x, y=event.y)
+
+
+def pan(event):
+    map_controller.pan(x=event.x, y=event.y)
+
+
+def close():
+    map_controller.close()
+    window.destroy()
 
 
 def key_press(event):
@@ -31,12 +44,18 @@ icon = tk.PhotoImage(file="images/aoe.png")
 window.iconphoto(True, icon)
 window.bind("<KeyPress>", key_press)
 window.bind("<KeyRelease>", key_release)
+window.protocol("WM_DELETE_WINDOW", close)
 
 frame = tk.Frame(window, width=INIT_WIDTH, height=INIT_HEIGHT)
 frame.pack(anchor=tk.NW)
 
 canvas = tk.Canvas(frame, width=INIT_WIDTH-INFO_BOARD_WIDTH, height=INIT_HEIGHT)
 canvas.pack(fill=tk.BOTH, expand=True, anchor=tk.NW)
+canvas.bind("<MouseWheel>", mouse_wheel)
+canvas.bind("<Button-4>", mouse_wheel)
+canvas.bind("<Button-5>", mouse_wheel)
+canvas.bind("<ButtonPress-3>", start_pan)
+canvas.bind("<B3-Motion>", pan)
 
 map_controller = MapController(window=window, canvas=canvas, frame=frame)
 map_controller.update_timer()
@@ -2,20 +2,26 @@ import copy
 import os
 import queue
 import tkinter as tk
+from typing import Iterable, Optional
 
 from dotenv import load_dotenv
 
-from helpers import Side, ActionType, MoveType, BuildAndDestroyType
+from app.board_state import BoardState
+from app.camera import Camera
+from app.helpers import Side, ActionType, Terrain, Owner, TerritoryFlag, RenderMode, NEUTRAL_COLOR, WALL_A_COLOR, \
+    WALL_B_COLOR, MAP_TAG, NEUTRAL_TAG, WALL_A_TAG, WALL_B_TAG, BORDER_TAG, LABEL_TAG, CRAFTSMAN_TAG
+from app.models import GameResp, GameActionsResp
+from app.raster_renderer import RasterRenderer, RASTER_MAX_SIZE
 from map_components import AbstractObject, Neutral, Position, Castle, CraftsManA, CraftsManB, Pond, \
-    AbstractObjectWithImage, WallA, WallB
-from models import GameResp, GameActionsResp
+    AbstractObjectWithImage, WallA, WallB, AbstractTerritory, OpenTerritoryA, OpenTerritoryB, CloseTerritoryA, \
+    CloseTerritoryB
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ''))
 load_dotenv(os.path.join(BASE_DIR, '../.env'))
 
 
 class Map:
-    def __init__(self, width: int, height: int, canvas: tk.Canvas):
+    def __init__(self, width: int, height: int, canvas: tk.Canvas, render_mode: RenderMode = RenderMode.CANVAS):
         self._width: int = width
         self._height: int = height
         self._canvas = canvas
@@ -24,10 +30,20 @@ class Map:
         self._point: list[list[AbstractObject]] = []
         self._craftsmen: list[AbstractObjectWithImage] = []
         self._queue = queue.Queue()
-        self._castle_point = 0
-        self._territory_point = 0
-        self._wall_point = 0
-        self._is_checked: list[list[bool]] = []
+        self._board: BoardState = BoardState(width=width, height=height)
+        self._renderer: RasterRenderer = None
+        self._camera: Camera = Camera(width=width, height=height)
+        if render_mode == RenderMode.RASTER:
+            self._renderer = RasterRenderer(canvas=canvas)
+            self._camera = Camera(width=width, height=height, max_rect_size=RASTER_MAX_SIZE // max(width, height, 1))
+        self._visible: (int, int, int, int) = (0, 0, 0, 0)
+        self._territory: dict[int, AbstractTerritory] = {}
+        self._rendered_walls: bytearray = bytearray(width * height)
+        self._rendered_territory: bytearray = bytearray(width * height)
+
+    @property
+    def board(self) -> BoardState:
+        return self._board
 
     def init_map(self, data: GameResp, window_width: int, window_height: int):
         self.create_map_neutral()
@@ -40,178 +56,236 @@ class Map:
             for y in range(self._height)]
             for x in range(self._width)]
 
+    def init_map_from_board(self, board: BoardState, window_width: int, window_height: int):
+        self._board = board
+        self.create_map_neutral()
+        self.create_map_component_from_board()
+        self.display(window_width=window_width, window_height=window_height)
+
     def create_map_component(self, data: GameResp):
         if data is None or data.field is None:
             return
-        self._castle_point = data.field.castle_coeff
-        self._territory_point = data.field.territory_coeff
-        self._wall_point = data.field.wall_coeff
-        for castle in data.field.castles:
-            self._point[castle.x][castle.y] = Castle(position=Position(x=castle.x, y=castle.y))
-        for pond in data.field.ponds:
-            self._point[pond.x][pond.y] = Pond(position=Position(x=pond.x, y=pond.y))
-        for craftsman in data.field.craftsmen:
-            if craftsman.side == Side.A:
-                self._craftsmen.append(CraftsManA(position=Position(x=craftsman.x, y=craftsman.y),
-                                                  craftsmen_id=craftsman.id))
-            if craftsman.side == Side.B:
-                self._craftsmen.append(CraftsManB(position=Position(x=craftsman.x, y=craftsman.y),
-                                                  craftsmen_id=craftsman.id))
-
-    def change_map_component_from_actions_response(self, child_action: GameActionsResp.ChildAction):
-        for craftsman in self._craftsmen:
-            if craftsman.craftsmen_id == child_action.craftsman_id:
-                if child_action.action == ActionType.MOVE:
-                    self.handle_move_action(craftsman=craftsman, child_action=child_action)
-                if child_action.action == ActionType.BUILD:
-                    self.handle_build_action(craftsman=craftsman, child_action=child_action)
-                if child_action.action == ActionType.DESTROY:
-                    self.handle_destroy_action(craftsman=craftsman, child_action=child_action)
-
-    def handle_move_action(self, craftsman: AbstractObjectWithImage, child_action: GameActionsResp.ChildAction):
-        move_type_mapping = {
-            MoveType.UPPER_LEFT: (-1, -1),
-            MoveType.LEFT: (-1, 0),
-            MoveType.LOWER_LEFT: (-1, 1),
-            MoveType.UP: (0, -1),
-            MoveType.DOWN: (0, 1),
-            MoveType.UPPER_RIGHT: (1, -1),
-            MoveType.RIGHT: (1, 0),
-            MoveType.LOWER_RIGHT: (1, 1)
-        }
-        (x, y) = move_type_mapping.get(child_action.action_param)
-        target_pos = Position(x=craftsman.position.x + x, y=craftsman.position.y + y)
-        if 0 <= target_pos.x < self._width and 0 <= target_pos.y < self._height:
-            type_of_target = type(self._point[target_pos.x][target_pos.y])
-            is_target_have_craftsman = self.check_if_position_has_craftsman(
-                position=self._point[target_pos.x][target_pos.y].position)
-            if not is_target_have_craftsman:
-                if type_of_target is Neutral or type_of_target is Castle:
-                    craftsman.position = target_pos
-                    craftsman.raise_rectangle(canvas=self._canvas)
-                if type_of_target is WallA and type(craftsman) is CraftsManA:
-                    craftsman.position = target_pos
-                    craftsman.raise_rectangle(canvas=self._canvas)
-                if type_of_target is WallB and type(craftsman) is CraftsManB:
-                    craftsman.position = target_pos
-                    craftsman.raise_rectangle(canvas=self._canvas)
-
-    def handle_build_action(self, craftsman: AbstractObjectWithImage, child_action: GameActionsResp.ChildAction):
-        build_type_mapping = {
-            BuildAndDestroyType.LEFT: (-1, 0),
-            BuildAndDestroyType.RIGHT: (1, 0),
-            BuildAndDestroyType.ABOVE: (0, -1),
-            BuildAndDestroyType.BELOW: (0, 1)
-        }
-        (x, y) = build_type_mapping.get(child_action.action_param)
-        target_pos = Position(x=craftsman.position.x + x, y=craftsman.position.y + y)
-        if 0 <= target_pos.x < self._width and 0 <= target_pos.y < self._height:
-            type_of_target = type(self._point[target_pos.x][target_pos.y])
-            is_target_have_craftsman = self.check_if_position_has_craftsman(
-                position=self._point[target_pos.x][target_pos.y].position)
-            if not is_target_have_craftsman and type_of_target is Neutral:
-                if type(craftsman) is CraftsManA:
-                    self._point[target_pos.x][target_pos.y] = WallA(position=target_pos)
+        self._board.load_field(field=data.field)
+        self.create_map_component_from_board()
+
+    def create_map_component_from_board(self):
+        for index, terrain in enumerate(self._board.terrain):
+            (x, y) = self._board.position(index=index)
+            if terrain == Terrain.CASTLE:
+                self._point[x][y] = Castle(position=Position(x=x, y=y))
+            if terrain == Terrain.POND:
+                self._point[x][y] = Pond(position=Position(x=x, y=y))
+            if self._board.walls[index] == Owner.A:
+                self._point[x][y] = WallA(position=Position(x=x, y=y))
+            if self._board.walls[index] == Owner.B:
+                self._point[x][y] = WallB(position=Position(x=x, y=y))
+            self.update_territory_status_of_square(index=index)
+        self._rendered_walls = bytearray(self._board.walls)
+        self._rendered_territory = bytearray(self._board.territory)
+        for i, craftsman_id in enumerate(self._board.craftsman_ids):
+            (x, y) = self._board.position(index=self._board.craftsman_positions[i])
+            if self._board.craftsman_sides[i] == Owner.A:
+                self._craftsmen.append(CraftsManA(position=Position(x=x, y=y), craftsmen_id=craftsman_id))
+            else:
+                self._craftsmen.append(CraftsManB(position=Position(x=x, y=y), craftsmen_id=craftsman_id))
+
+    def apply_turn(self, actions: list[GameActionsResp.ChildAction], turn: int):
+        changed = set(self._board.apply_turn(actions=actions, turn=turn))
+        changed.update(self._board.update_territory())
+        self.render_changes(changed=changed)
+
+    def render_changes(self, changed: Iterable[int]):
+        """Redraw only the squares in ``changed`` that differ from what is on the canvas and move the craftsmen."""
+        dirty = []
+        for index in changed:
+            wall = self._board.walls[index]
+            flags = self._board.territory[index]
+            if wall != self._rendered_walls[index] or flags != self._rendered_territory[index]:
+                dirty.append(index)
+            if wall != self._rendered_walls[index]:
+                self._rendered_walls[index] = wall
+                if wall == Owner.NONE:
+                    self.handle_destroy_action(target=index)
                 else:
-                    self._point[target_pos.x][target_pos.y] = WallB(position=target_pos)
-
-    def handle_destroy_action(self, craftsman: AbstractObjectWithImage, child_action: GameActionsResp.ChildAction):
-        destroy_type_mapping = {
-            BuildAndDestroyType.LEFT: (-1, 0),
-            BuildAndDestroyType.RIGHT: (1, 0),
-            BuildAndDestroyType.ABOVE: (0, -1),
-            BuildAndDestroyType.BELOW: (0, 1)
-        }
-        (x, y) = destroy_type_mapping.get(child_action.action_param)
-        target_pos = Position(x=craftsman.position.x + x, y=craftsman.position.y + y)
-        if 0 <= target_pos.x < self._width and 0 <= target_pos.y < self._height:
-            type_of_target = type(self._point[target_pos.x][target_pos.y])
-            if type_of_target is WallA or type_of_target is WallB:
-                self._point[target_pos.x][target_pos.y] = Neutral(position=target_pos)
-
-    def check_if_position_has_craftsman(self, position: Position) \
-            -> bool:
-        for craftsman in self._craftsmen:
-            if craftsman.position.x == position.x and craftsman.position.y == position.y:
-                return True
-        return False
+                    self.handle_build_action(target=index)
+            if flags != self._rendered_territory[index]:
+                self._rendered_territory[index] = flags
+                self.update_territory_status_of_square(index=index)
+        for i, craftsman in enumerate(self._craftsmen):
+            target = self._board.craftsman_positions[i]
+            source = self._board.index(x=craftsman.position.x, y=craftsman.position.y)
+            if source != target:
+                dirty.extend((source, target))
+                self.handle_move_action(craftsman=craftsman, target=target)
+        if self._renderer:
+            self._renderer.update(indexes=dirty)
+
+    def handle_move_action(self, craftsman: AbstractObjectWithImage, target: int):
+        (x, y) = self._board.position(index=target)
+        craftsman.position = Position(x=x, y=y)
+        if not self.is_visible(x=x, y=y):
+            if craftsman.rectangle:
+                craftsman.delete_rectangle(canvas=self._canvas)
+            return
+        (x1, y1, x2, y2) = self.get_square_coords(x=x, y=y)
+        if craftsman.rectangle:
+            craftsman.change_the_position(x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas)
+            craftsman.raise_rectangle(canvas=self._canvas)
+        else:
+            craftsman.display(x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas)
+
+    def handle_build_action(self, target: int):
+        (x, y) = self._board.position(index=target)
+        if self._board.walls[target] == Owner.A:
+            self.replace_square(square=WallA(position=Position(x=x, y=y)))
+        else:
+            self.replace_square(square=WallB(position=Position(x=x, y=y)))
+
+    def handle_destroy_action(self, target: int):
+        (x, y) = self._board.position(index=target)
+        self.replace_square(square=Neutral(position=Position(x=x, y=y)))
+
+    def replace_square(self, square: AbstractObject):
+        (x, y) = (square.position.x, square.position.y)
+        previous = self._point[x][y]
+        self._point[x][y] = square
+        if previous.rectangle:
+            previous.delete(canvas=self._canvas)
+            (x1, y1, x2, y2) = self.get_square_coords(x=x, y=y)
+            square.display(x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas)
+            # Squares never overlap, so the new one only has to stay below the craftsmen.
+            self._canvas.tag_lower(square.rectangle)
+
+    def get_square_coords(self, x: int, y: int) -> (int, int, int, int):
+        return self._camera.get_square_coords(x=x, y=y)
+
+    def is_visible(self, x: int, y: int) -> bool:
+        (x1, y1, x2, y2) = self._visible
+        return x1 <= x < x2 and y1 <= y < y2
 
     def resize(self, window_width: int, window_height: int):
-        rect_width = int(window_width / self._width)
-        rect_height = int(window_height / self._height)
-
-        for row in self._point:
-            for square in row:
-                x1 = square.position.x * rect_width
-                y1 = square.position.y * rect_height
-                x2 = x1 + rect_width
-                y2 = y1 + rect_height
-                square.change_the_position(
-                    x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas
-                )
+        state = self._camera.state
+        self._camera.fit(viewport_width=window_width, viewport_height=window_height)
+        self.update_view(previous_state=state)
+
+    def zoom(self, factor: float, x: int, y: int):
+        state = self._camera.state
+        self._camera.zoom(factor=factor, anchor_x=x, anchor_y=y)
+        self.update_view(previous_state=state)
+
+    def pan(self, dx: int, dy: int):
+        state = self._camera.state
+        self._camera.pan(dx=dx, dy=dy)
+        self.update_view(previous_state=state)
+
+    def update_view(self, previous_state: (int, int, int, int)):
+        """Move the canvas items from the camera ``previous_state`` to the current one.
+
+        Items that stay visible are scaled and moved by tag, only squares entering or leaving the viewport are
+        created or deleted.
+        """
+        (old_width, old_height, old_x, old_y) = previous_state
+        (rect_width, rect_height, offset_x, offset_y) = self._camera.state
+        if old_width <= 0 or old_height <= 0:
+            return
+        if previous_state == self._camera.state:
+            if not self._renderer:
+                self.update_visible_squares()
+            return
+        is_resized = (old_width, old_height) != (rect_width, rect_height)
+        (scale_x, scale_y) = (rect_width / old_width, rect_height / old_height)
+        if is_resized:
+            self._canvas.scale(MAP_TAG, 0, 0, scale_x, scale_y)
+        self._canvas.move(MAP_TAG, old_x * scale_x - offset_x, old_y * scale_y - offset_y)
+        if self._renderer:
+            if is_resized:
+                self._renderer.render(board=self._board, rect_width=rect_width, rect_height=rect_height,
+                                      x=-offset_x, y=-offset_y)
+            return
 
+        if is_resized:
+            (x1, y1, x2, y2) = self._visible
+            for x in range(x1, x2):
+                for y in range(y1, y2):
+                    if isinstance(self._point[x][y], AbstractObjectWithImage):
+                        self._point[x][y].change_image_size(width=rect_width, height=rect_height,
+                                                            canvas=self._canvas)
+            for craftsman in self._craftsmen:
+                if craftsman.rectangle:
+                    craftsman.change_image_size(width=rect_width, height=rect_height, canvas=self._canvas)
+        self.update_visible_squares()
+
+    def update_visible_squares(self):
+        (old_x1, old_y1, old_x2, old_y2) = self._visible
+        (x1, y1, x2, y2) = self._camera.get_visible_range()
+        if (x1, y1, x2, y2) == self._visible:
+            return
+        self._visible = (x1, y1, x2, y2)
+        for x in range(old_x1, old_x2):
+            for y in range(old_y1, old_y2):
+                if not self.is_visible(x=x, y=y):
+                    self._point[x][y].delete(canvas=self._canvas)
+                    overlay = self._territory.get(self._board.index(x=x, y=y))
+                    if overlay:
+                        overlay.delete(canvas=self._canvas)
+        for x in range(x1, x2):
+            for y in range(y1, y2):
+                if not (old_x1 <= x < old_x2 and old_y1 <= y < old_y2):
+                    (square_x1, square_y1, square_x2, square_y2) = self.get_square_coords(x=x, y=y)
+                    square = self._point[x][y]
+                    square.display(x1=square_x1, y1=square_y1, x2=square_x2, y2=square_y2, canvas=self._canvas)
+                    self._canvas.tag_lower(square.rectangle)
+                    overlay = self._territory.get(self._board.index(x=x, y=y))
+                    if overlay:
+                        self.display_territory_overlay(overlay=overlay)
         for craftsman in self._craftsmen:
-            x1 = craftsman.position.x * rect_width
-            y1 = craftsman.position.y * rect_height
-            x2 = x1 + rect_width
-            y2 = y1 + rect_height
-            craftsman.change_the_position(
-                x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas
-            )
-            craftsman.raise_rectangle(canvas=self._canvas)
+            (x, y) = (craftsman.position.x, craftsman.position.y)
+            if self.is_visible(x=x, y=y) and not craftsman.rectangle:
+                (square_x1, square_y1, square_x2, square_y2) = self.get_square_coords(x=x, y=y)
+                craftsman.display(x1=square_x1, y1=square_y1, x2=square_x2, y2=square_y2, canvas=self._canvas)
+            elif not self.is_visible(x=x, y=y) and craftsman.rectangle:
+                craftsman.delete_rectangle(canvas=self._canvas)
 
     def display(self, window_width: int, window_height: int):
-        rect_width = int(window_width / self._width)
-        rect_height = int(window_height / self._height)
-
-        for row in self._point:
-            for square in row:
-                x1 = square.position.x * rect_width
-                y1 = square.position.y * rect_height
-                x2 = x1 + rect_width
-                y2 = y1 + rect_height
-                square.display(
-                    x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas
-                )
-
-        for craftsman in self._craftsmen:
-            x1 = craftsman.position.x * rect_width
-            y1 = craftsman.position.y * rect_height
-            x2 = x1 + rect_width
-            y2 = y1 + rect_height
-            craftsman.display(
-                x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas
-            )
+        self._camera.fit(viewport_width=window_width, viewport_height=window_height)
+        if self._renderer:
+            self._renderer.render(board=self._board, rect_width=self._camera.rect_width,
+                                  rect_height=self._camera.rect_height,
+                                  x=-self._camera.offset_x, y=-self._camera.offset_y)
+            return
+        self._visible = (0, 0, 0, 0)
+        self.update_visible_squares()
 
     def delete(self):
-        self.reset()
+        self._canvas.delete(MAP_TAG)
         for row in self._point:
             for square in row:
-                square.delete(canvas=self._canvas)
+                square.forget_items()
+        for overlay in self._territory.values():
+            overlay.forget_items()
         for craftsman in self._craftsmen:
-            craftsman.delete(canvas=self._canvas)
+            craftsman.forget_items()
+            craftsman.is_played = False
 
     def reset(self):
-        for row in self._point:
-            for square in row:
-                square.delete_wrapper(canvas=self._canvas)
-                square.revert_color(canvas=self._canvas)
+        if self._renderer:
+            self._renderer.clear_highlights()
+        self._canvas.itemconfig(NEUTRAL_TAG, fill=NEUTRAL_COLOR)
+        self._canvas.itemconfig(WALL_A_TAG, fill=WALL_A_COLOR)
+        self._canvas.itemconfig(WALL_B_TAG, fill=WALL_B_COLOR)
+        self._canvas.delete(BORDER_TAG)
+        self._canvas.delete(LABEL_TAG)
         for craftsman in self._craftsmen:
-            craftsman.delete_border(canvas=self._canvas)
-            craftsman.delete_wrapper(canvas=self._canvas)
+            craftsman.border = None
+            craftsman.wrapper = None
+            craftsman.is_chosen = False
             craftsman.is_played = False
 
     def choose_craftsman(self, side: Side, window_width: int, window_height: int):
-        rect_width = int(window_width / self._width)
-        rect_height = int(window_height / self._height)
-
         for craftsman in self._craftsmen:
             if side == Side.A and type(craftsman) is CraftsManA or side == Side.B and type(craftsman) is CraftsManB:
                 if not craftsman.is_played:
-                    x1 = craftsman.position.x * rect_width
-                    y1 = craftsman.position.y * rect_height
-                    x2 = x1 + rect_width
-                    y2 = y1 + rect_height
+                    (x1, y1, x2, y2) = self.get_square_coords(x=craftsman.position.x, y=craftsman.position.y)
                     craftsman.choose(canvas=self._canvas, x1=x1, y1=y1, x2=x2, y2=y2)
                     craftsman.is_played = True
                     self._chosen_craftsman_pos = craftsman.position
@@ -222,10 +296,7 @@ class Map:
         for craftsman in self._craftsmen:
             if side == Side.A and type(craftsman) is CraftsManA or side == Side.B and type(craftsman) is CraftsManB:
                 if not craftsman.is_played:
-                    x1 = craftsman.position.x * rect_width
-                    y1 = craftsman.position.y * rect_height
-                    x2 = x1 + rect_width
-                    y2 = y1 + rect_height
+                    (x1, y1, x2, y2) = self.get_square_coords(x=craftsman.position.x, y=craftsman.position.y)
                     craftsman.choose(canvas=self._canvas, x1=x1, y1=y1, x2=x2, y2=y2)
                     craftsman.is_played = True
                     self._chosen_craftsman_pos = craftsman.position
@@ -246,11 +317,27 @@ class Map:
             square_y += 1
 
         if 0 <= square_x < window_width - 1 and 0 <= square_y < window_height - 1:
-            self._point[square_x][square_y].change_color(canvas=self._canvas)
-            self._point[square_x][square_y].raise_rectangle(canvas=self._canvas)
+            self.change_square_color(x=square_x, y=square_y)
             self.update_queue(position=self._point[square_x][square_y].position)
             self.revert_neighbor_color(x=self._chosen_craftsman_pos.x, y=self._chosen_craftsman_pos.y)
 
+    def change_square_color(self, x: int, y: int):
+        if self._renderer:
+            self._renderer.highlight(index=self._board.index(x=x, y=y))
+            return
+        if not self._point[x][y].rectangle:
+            return
+        # The square is not raised, it stays under its territory overlay and the craftsmen.
+        self._point[x][y].change_color(canvas=self._canvas)
+
+    def revert_square_color(self, x: int, y: int):
+        if self._renderer:
+            self._renderer.clear_highlight(index=self._board.index(x=x, y=y))
+            return
+        if not self._point[x][y].rectangle:
+            return
+        self._point[x][y].revert_color(self._canvas)
+
     def update_queue(self, position: Position):
         self._queue.put(position)
         if self._queue.qsize() > len(self._craftsmen) / 2:
@@ -277,109 +364,61 @@ class Map:
                         is_change_color = False
                     self._queue.put(item)
                 if is_change_color:
-                    self._point[x + i][y + j].revert_color(self._canvas)
+                    self.revert_square_color(x=x + i, y=y + j)
 
     def get_actual_position(self, position: Position, window_width: int, window_height: int):
-        rect_width = int(window_width / self._width)
-        rect_height = int(window_height / self._height)
-        return position.x * rect_width, position.y * rect_height
+        (x1, y1, _, _) = self.get_square_coords(x=position.x, y=position.y)
+        return x1, y1
 
     def update_choose_action_on_craftsman(self, craftsman: AbstractObject, action_type: ActionType,
                                           window_width: int, window_height: int):
-        rect_width = int(window_width / self._width)
-        rect_height = int(window_height / self._height)
-        x1 = craftsman.position.x * rect_width
-        y1 = craftsman.position.y * rect_height
-        x2 = x1 + rect_width
-        y2 = y1 + rect_height
+        (x1, y1, x2, y2) = self.get_square_coords(x=craftsman.position.x, y=craftsman.position.y)
         craftsman.choose_action(canvas=self._canvas, action_type=action_type,
                                 x1=x1, x2=x2, y1=y1, y2=y2)
 
     def calculate_point(self) -> (int, int):
-        point_a = 0
-        point_b = 0
+        return self._board.calculate_point()
+
+    def update_territory_status_of_square(self, index: int):
+        (x, y) = self._board.position(index=index)
+        square = self._point[x][y]
+        flags = self._board.territory[index]
+        square.is_close_territory_a = bool(flags & TerritoryFlag.CLOSE_A)
+        square.is_close_territory_b = bool(flags & TerritoryFlag.CLOSE_B)
+        square.is_open_territory_a = bool(flags & TerritoryFlag.OPEN_A)
+        square.is_open_territory_b = bool(flags & TerritoryFlag.OPEN_B)
+        self.update_territory_overlay(index=index)
+
+    def update_territory_overlay(self, index: int):
+        """Replace the territory overlay of one square, drawn only in canvas mode when the square is visible."""
+        if self._renderer:
+            return
+        previous = self._territory.pop(index, None)
+        if previous:
+            previous.delete(canvas=self._canvas)
+        overlay = self.create_territory_overlay(index=index)
+        if overlay is None:
+            return
+        self._territory[index] = overlay
+        if self.is_visible(x=overlay.position.x, y=overlay.position.y):
+            self.display_territory_overlay(overlay=overlay)
+
+    def create_territory_overlay(self, index: int) -> Optional[AbstractTerritory]:
+        (x, y) = self._board.position(index=index)
+        flags = self._board.territory[index]
+        if flags & TerritoryFlag.CLOSE_A:
+            return CloseTerritoryA(position=Position(x=x, y=y))
+        if flags & TerritoryFlag.CLOSE_B:
+            return CloseTerritoryB(position=Position(x=x, y=y))
+        if flags & TerritoryFlag.OPEN_A:
+            return OpenTerritoryA(position=Position(x=x, y=y))
+        if flags & TerritoryFlag.OPEN_B:
+            return OpenTerritoryB(position=Position(x=x, y=y))
+        return None
 
-        for row in self._point:
-            for square in row:
-                if type(square) is WallA:
-                    point_a += self._wall_point
-                if type(square) is WallB:
-                    point_b += self._wall_point
-                if square.is_close_territory_a or square.is_open_territory_a:
-                    if type(square) is Castle:
-                        point_a += self._castle_point
-                    else:
-                        point_a += self._territory_point
-                if square.is_close_territory_b or square.is_open_territory_b:
-                    if type(square) is Castle:
-                        point_b += self._castle_point
-                    else:
-                        point_b += self._territory_point
-
-        return point_a, point_b
-
-    def update_territory_status(self):
-        for row in self._point:
-            for square in row:
-                is_close_territory_a = self.check_if_square_is_close_territory(square, side=Side.A)
-                is_close_territory_b = self.check_if_square_is_close_territory(square, side=Side.B)
-                if is_close_territory_a and is_close_territory_b:
-                    square.is_close_territory_a = True
-                    square.is_close_territory_b = True
-                    square.is_open_territory_a = False
-                    square.is_open_territory_b = False
-                elif is_close_territory_a:
-                    square.is_close_territory_a = True
-                    square.is_close_territory_b = False
-                    square.is_open_territory_a = False
-                    square.is_open_territory_b = False
-                elif is_close_territory_b:
-                    square.is_close_territory_a = False
-                    square.is_close_territory_b = True
-                    square.is_open_territory_a = False
-                    square.is_open_territory_b = False
-                else:
-                    if square.is_close_territory_a:
-                        square.is_close_territory_a = False
-                        square.is_close_territory_b = False
-                        square.is_open_territory_a = True
-                        square.is_open_territory_b = False
-                    if square.is_close_territory_b:
-                        square.is_close_territory_a = False
-                        square.is_close_territory_b = False
-                        square.is_open_territory_a = False
-                        square.is_open_territory_b = True
-
-    def check_if_square_is_close_territory(self, square, side: Side):
-        if type(square) is WallA and side == Side.A:
-            return False
-        if type(square) is WallB and side == Side.B:
-            return False
-        self._is_checked = [[
-            False
-            for y in range(self._height)]
-            for x in range(self._width)]
-        return self.bfs(square=square, side=side)
-
-    def bfs(self, square, side: Side):
-        x = square.position.x
-        y = square.position.y
-        if self._is_checked[x][y]:
-            return True
-        self._is_checked[x][y] = True
-        if type(self._point[x][y]) is WallA and side == Side.A:
-            return True
-        if type(self._point[x][y]) is WallB and side == Side.B:
-            return True
-        if x == 0 or y == 0 \
-                or x == self._width-1 or y == self._height-1:
-            return False
-        if not self.bfs(square=self._point[x-1][y], side=side):
-            return False
-        if not self.bfs(square=self._point[x][y-1], side=side):
-            return False
-        if not self.bfs(square=self._point[x+1][y], side=side):
-            return False
-        if not self.bfs(square=self._point[x][y+1], side=side):
-            return False
-        return True
+    def display_territory_overlay(self, overlay: AbstractTerritory):
+        (x1, y1, x2, y2) = self.get_square_coords(x=overlay.position.x, y=overlay.position.y)
+        overlay.display(x1=x1, y1=y1, x2=x2, y2=y2, canvas=self._canvas)
+        # New items are drawn on top, move the overlay back below the craftsmen.
+        if any(craftsman.rectangle for craftsman in self._craftsmen):
+            self._canvas.tag_lower(overlay.rectangle, CRAFTSMAN_TAG)
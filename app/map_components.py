@@ -1,8 +1,9 @@
 import tkinter as tk
 
-from PIL import Image, ImageTk
-
-from app.helpers import WALL_B_COLOR, WALL_A_COLOR, CHOOSE_COLOR, BORDER_COLOR, NEUTRAL_COLOR, POND_COLOR, ActionType
+from app.helpers import WALL_B_COLOR, WALL_A_COLOR, CHOOSE_COLOR, BORDER_COLOR, NEUTRAL_COLOR, POND_COLOR, ActionType, \
+    MAP_TAG, NEUTRAL_TAG, POND_TAG, CASTLE_TAG, WALL_A_TAG, WALL_B_TAG, CRAFTSMAN_TAG, BORDER_TAG, LABEL_TAG, \
+    TERRITORY_TAG, TERRITORY_A_COLOR, TERRITORY_B_COLOR, CLOSE_TERRITORY_STIPPLE, OPEN_TERRITORY_STIPPLE
+from app.sprites import get_sprite
 
 
 class Position:
@@ -15,6 +16,7 @@ class Position:
 
 
 class AbstractObject:
+    tag: str = MAP_TAG
 
     def __init__(self, position: Position):
         self.position: Position = position
@@ -40,6 +42,11 @@ class AbstractObject:
             self.wrapper = None
         self.is_chosen = False
 
+    def delete_rectangle(self, canvas: tk.Canvas):
+        if self.rectangle:
+            canvas.delete(self.rectangle)
+            self.rectangle = None
+
     def delete_wrapper(self, canvas: tk.Canvas):
         if self.wrapper:
             canvas.delete(self.wrapper)
@@ -86,6 +93,13 @@ class AbstractObject:
     def raise_rectangle(self, canvas: tk.Canvas):
         canvas.tag_raise(self.rectangle)
 
+    def forget_items(self):
+        """Drop the canvas items after they were deleted by tag."""
+        self.rectangle = None
+        self.border = None
+        self.wrapper = None
+        self.is_chosen = False
+
 
 class AbstractObjectWithColor(AbstractObject):
     color: str
@@ -96,12 +110,12 @@ class AbstractObjectWithColor(AbstractObject):
 
     def display(self, x1: int, y1: int,
                 x2: int, y2: int, canvas: tk.Canvas):
-        self.rectangle = canvas.create_rectangle(x1, y1, x2, y2, fill=self.color)
+        self.rectangle = canvas.create_rectangle(x1, y1, x2, y2, fill=self.color, tags=(MAP_TAG, self.tag))
 
     def change_the_position(self, x1: int, y1: int,
                             x2: int, y2: int, canvas: tk.Canvas):
         if not self.rectangle:
-            self.rectangle = canvas.create_rectangle(x1, y1, x2, y2, fill=self.color)
+            self.rectangle = canvas.create_rectangle(x1, y1, x2, y2, fill=self.color, tags=(MAP_TAG, self.tag))
         rect_coords = (x1, y1, x2, y2)
         canvas.coords(self.rectangle, rect_coords)
 
@@ -116,31 +130,37 @@ class AbstractObjectWithImage(AbstractObject):
 
     def display(self, x1: int, y1: int,
                 x2: int, y2: int, canvas: tk.Canvas):
-        image = Image.open(self.image_path)
-        resized_image = image.resize((int(x2-x1), int(y2-y1)))
-        self.image = ImageTk.PhotoImage(resized_image)
-        self.rectangle = canvas.create_image(x1, y1, image=self.image, anchor=tk.NW)
+        self.image = get_sprite(image_path=self.image_path, width=x2 - x1, height=y2 - y1)
+        self.rectangle = canvas.create_image(x1, y1, image=self.image, anchor=tk.NW, tags=(MAP_TAG, self.tag))
 
     def change_the_position(self, x1: int, y1: int,
                             x2: int, y2: int, canvas: tk.Canvas):
-        image = Image.open(self.image_path)
-        resized_image = image.resize((int(x2-x1), int(y2-y1)))
-        self.image = ImageTk.PhotoImage(resized_image)
+        self.image = get_sprite(image_path=self.image_path, width=x2 - x1, height=y2 - y1)
         canvas.itemconfig(self.rectangle, image=self.image)
         canvas.coords(self.rectangle, x1, y1)
 
+    def change_image_size(self, width: int, height: int, canvas: tk.Canvas):
+        self.image = get_sprite(image_path=self.image_path, width=width, height=height)
+        canvas.itemconfig(self.rectangle, image=self.image)
+
 
 class Castle(AbstractObjectWithImage):
+    tag: str = CASTLE_TAG
+
     def __init__(self, position: Position):
         super().__init__(position=position, image_path="./images/castle.png")
 
 
 class Pond(AbstractObjectWithColor):
+    tag: str = POND_TAG
+
     def __init__(self, position: Position):
         super().__init__(position=position, color=POND_COLOR)
 
 
 class Neutral(AbstractObjectWithColor):
+    tag: str = NEUTRAL_TAG
+
     def __init__(self, position: Position):
         super().__init__(position=position, color=NEUTRAL_COLOR)
 
@@ -152,6 +172,7 @@ class Neutral(AbstractObjectWithColor):
 
 
 class CraftsManA(AbstractObjectWithImage):
+    tag: str = CRAFTSMAN_TAG
 
     def __init__(self, position: Position, craftsmen_id: str):
         super().__init__(position=position, image_path="./images/craftsmen_a.png")
@@ -162,7 +183,8 @@ class CraftsManA(AbstractObjectWithImage):
                x1: int, y1: int, x2: int, y2: int):
         self.is_chosen = True
         if not self.border:
-            self.border = canvas.create_rectangle(x1, y1, x2, y2, width=5, outline=BORDER_COLOR)
+            self.border = canvas.create_rectangle(x1, y1, x2, y2, width=5, outline=BORDER_COLOR,
+                                                  tags=(MAP_TAG, BORDER_TAG))
 
     def choose_action(self, canvas: tk.Canvas, action_type: ActionType, x1: int, y1: int, x2: int, y2: int):
         if self.wrapper:
@@ -170,10 +192,13 @@ class CraftsManA(AbstractObjectWithImage):
             self.wrapper = None
         text_x = int(x1 + (x2 - x1) / 2)
         text_y = int(y1 + (y2 - y1) / 2)
-        self.wrapper = canvas.create_text(text_x, text_y, text=action_type, font=("Arial", 10), fill=BORDER_COLOR)
+        self.wrapper = canvas.create_text(text_x, text_y, text=action_type, font=("Arial", 10), fill=BORDER_COLOR,
+                                          tags=(MAP_TAG, LABEL_TAG))
 
 
 class CraftsManB(AbstractObjectWithImage):
+    tag: str = CRAFTSMAN_TAG
+
     def __init__(self, position: Position, craftsmen_id: str):
         super().__init__(position=position, image_path="./images/craftsmen_b.png")
         self.craftsmen_id = craftsmen_id
@@ -183,7 +208,8 @@ class CraftsManB(AbstractObjectWithImage):
                x1: int, y1: int, x2: int, y2: int):
         self.is_chosen = True
         if not self.border:
-            self.border = canvas.create_rectangle(x1, y1, x2, y2, width=5, outline=BORDER_COLOR)
+            self.border = canvas.create_rectangle(x1, y1, x2, y2, width=5, outline=BORDER_COLOR,
+                                                  tags=(MAP_TAG, BORDER_TAG))
 
     def choose_action(self, canvas: tk.Canvas, action_type: ActionType, x1: int, y1: int, x2: int, y2: int):
         if self.wrapper:
@@ -191,10 +217,13 @@ class CraftsManB(AbstractObjectWithImage):
             self.wrapper = None
         text_x = int(x1 + (x2 - x1) / 2)
         text_y = int(y1 + (y2 - y1) / 2)
-        self.wrapper = canvas.create_text(text_x, text_y, text=action_type, font=("Arial", 10), fill=BORDER_COLOR)
+        self.wrapper = canvas.create_text(text_x, text_y, text=action_type, font=("Arial", 10), fill=BORDER_COLOR,
+                                          tags=(MAP_TAG, LABEL_TAG))
 
 
 class WallA(AbstractObjectWithColor):
+    tag: str = WALL_A_TAG
+
     def __init__(self, position: Position):
         super().__init__(position=position, color=WALL_A_COLOR)
 
@@ -206,6 +235,8 @@ class WallA(AbstractObjectWithColor):
 
 
 class WallB(AbstractObjectWithColor):
+    tag: str = WALL_B_TAG
+
     def __init__(self, position: Position):
         super().__init__(position=position, color=WALL_B_COLOR)
 
@@ -216,17 +247,46 @@ class WallB(AbstractObjectWithColor):
         canvas.itemconfig(self.rectangle, fill=CHOOSE_COLOR)
 
 
-class OpenTerritoryA(AbstractObjectWithColor):
-    pass
+class AbstractTerritory(AbstractObjectWithColor):
+    """Stippled square drawn above the terrain and below the craftsmen, the terrain stays visible through it."""
+    tag: str = TERRITORY_TAG
+    stipple: str
 
+    def display(self, x1: int, y1: int,
+                x2: int, y2: int, canvas: tk.Canvas):
+        self.rectangle = canvas.create_rectangle(x1, y1, x2, y2, fill=self.color, stipple=self.stipple, outline="",
+                                                 tags=(MAP_TAG, self.tag))
 
-class OpenTerritoryB(AbstractObjectWithColor):
-    pass
+    def change_the_position(self, x1: int, y1: int,
+                            x2: int, y2: int, canvas: tk.Canvas):
+        if not self.rectangle:
+            self.display(x1=x1, y1=y1, x2=x2, y2=y2, canvas=canvas)
+        canvas.coords(self.rectangle, x1, y1, x2, y2)
 
 
-class CloseTerritoryA(AbstractObjectWithColor):
-    pass
+class OpenTerritoryA(AbstractTerritory):
+    stipple: str = OPEN_TERRITORY_STIPPLE
+
+    def __init__(self, position: Position):
+        super().__init__(position=position, color=TERRITORY_A_COLOR)
 
 
-class CloseTerritoryB(AbstractObjectWithColor):
-    pass
+class OpenTerritoryB(AbstractTerritory):
+    stipple: str = OPEN_TERRITORY_STIPPLE
+
+    def __init__(self, position: Position):
+        super().__init__(position=position, color=TERRITORY_B_COLOR)
+
+
+class CloseTerritoryA(AbstractTerritory):
+    stipple: str = CLOSE_TERRITORY_STIPPLE
+
+    def __init__(self, position: Position):
+        super().__init__(position=position, color=TERRITORY_A_COLOR)
+
+
+class CloseTerritoryB(AbstractTerritory):
+    stipple: str = CLOSE_TERRITORY_STIPPLE
+
+    def __init__(self, position: Position):
+        super().__init__(position=position, color=TERRITORY_B_COLOR)
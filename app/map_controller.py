@@ -1,15 +1,28 @@
+import asyncio
 import copy
 import json
+import math
 import os
+import time
 import tkinter as tk
-from typing import List
-
-from app.helpers import State, Side, INIT_WIDTH, INFO_BOARD_WIDTH, ActionType, MoveType, INIT_HEIGHT
+from typing import Callable
+
+from app.helpers import State, Side, INIT_WIDTH, INFO_BOARD_WIDTH, ActionType, MoveType, INIT_HEIGHT, \
+    PLAN_SAFETY_MARGIN, PLAN_MIN_TIME, RESIZE_INTERVAL, RenderMode, STATUS_REQUEST, SNAPSHOT_REQUEST, \
+    ACTIONS_REQUEST, REBUILD_REQUEST, CHECKPOINT_REQUEST, SUBMIT_SAFETY_MARGIN
+from app.action_log import ActionLog
+from app.board_state import BoardState
+from app.camera import ZOOM_STEP
+from app.checkpoint import CheckpointStore
+from app.legal_actions import find_illegal_actions
 from app.map import Map
+from app.models import GameActionsReq, GameActionsResp, GameResp, GameStatusResp
+from app.network_worker import NetworkWorker
+from app.planner import Planner
+from app.services import AsyncService, GameSnapshot, Service
+from app.turn_clock import TurnClock, MIN_POLL_INTERVAL, call_timed
 from app.utils import mapping_from_key_list_to_action_type
 from map_components import CraftsManA
-from models import GameActionsReq, GameResp, GameActionsResp
-from services import Service
 
 
 class MapController:
@@ -19,6 +32,17 @@ class MapController:
         self._frame: tk.Frame = frame
         self._canvas: tk.Canvas = canvas
         self._services: Service = Service()
+        self._async_services: AsyncService = AsyncService(service=self._services)
+        self._network: NetworkWorker = NetworkWorker(widget=window)
+        self._timer_job: str = None
+        self._turn_clock: TurnClock = TurnClock()
+        self._last_poll: float = 0
+        self._submit_margin: float = float(os.getenv('SUBMIT_MARGIN', SUBMIT_SAFETY_MARGIN))
+        self._plan_turn: int = None
+        self._render_mode: RenderMode = RenderMode(os.getenv('RENDER_MODE', RenderMode.CANVAS))
+        self._resize_job: str = None
+        self._pan_position: (int, int) = (0, 0)
+        self._window_size: (int, int) = (0, 0)
         self._team_id: int = int(os.getenv('TEAM_ID', 0))
         self._state: State = State.WAITING
         self._craftsman: CraftsManA = None
@@ -45,7 +69,7 @@ class MapController:
         self._turn_text.place(x=INIT_WIDTH-INFO_BOARD_WIDTH, y=100)
         self._turn_text.pack()
 
-        self._time_remain: int = 30
+        self._time_remain: float = 30
         self._time_remain_text: tk.Label = tk.Label(self._frame, text=f"Time remaining: {self._time_remain}",
                                                     font=("Arial", 12))
         self._time_remain_text.place(x=INIT_WIDTH-INFO_BOARD_WIDTH, y=150)
@@ -68,7 +92,15 @@ class MapController:
         self._point_text.place(x=INIT_WIDTH - INFO_BOARD_WIDTH, y=650)
         self._point_text.pack()
 
+        self._planner: Planner = Planner()
+        self._action_log: ActionLog = ActionLog()
+        self._checkpoints: CheckpointStore = CheckpointStore(game_id=os.getenv('GAME_ID', 0))
+        self._plan_button: tk.Button = tk.Button(frame, text="Auto plan", command=self.auto_plan)
+        self._plan_button.place(x=INIT_WIDTH - INFO_BOARD_WIDTH, y=700)
+        self._plan_button.pack()
+
         self._my_map: Map = None
+        self._is_map_created: bool = False
         self.init_map()
 
     def init_map(self):
@@ -80,12 +112,36 @@ class MapController:
         self._frame.config(width=window_width, height=window_height)
         self._canvas.config(width=window_width-INFO_BOARD_WIDTH, height=window_height)
 
-        self._my_map = Map(canvas=self._canvas, width=grid_width, height=grid_height)
+        self._my_map = Map(canvas=self._canvas, width=grid_width, height=grid_height, render_mode=self._render_mode)
         self._my_map.init_map(data=GameResp(), window_width=window_width-INFO_BOARD_WIDTH, window_height=window_height)
 
+    def zoom(self, zoom_in: bool, x: int, y: int):
+        if self._my_map:
+            self._my_map.zoom(factor=ZOOM_STEP if zoom_in else 1 / ZOOM_STEP, x=x, y=y)
+
+    def start_pan(self, x: int, y: int):
+        self._pan_position = (x, y)
+
+    def pan(self, x: int, y: int):
+        (last_x, last_y) = self._pan_position
+        self._pan_position = (x, y)
+        if self._my_map:
+            self._my_map.pan(dx=last_x - x, dy=last_y - y)
+
+    def request_resize(self):
+        """Run ``resize`` once for all the resize events of the next ``RESIZE_INTERVAL`` milliseconds."""
+        if self._resize_job is None:
+            self._resize_job = self._window.after(RESIZE_INTERVAL, self.resize)
+
     def resize(self):
+        self._resize_job = None
         window_width = self._window.winfo_width()
         window_height = self._window.winfo_height()
+        if (window_width, window_height) == self._window_size:
+            return
+        self._window_size = (window_width, window_height)
+        self._frame.config(width=window_width, height=window_height)
+        self._canvas.config(width=window_width - INFO_BOARD_WIDTH, height=window_height)
         if self._my_map:
             self._my_map.resize(window_width=window_width-INFO_BOARD_WIDTH, window_height=window_height)
         self._pull_map_button.place(x=window_width - INFO_BOARD_WIDTH, y=0)
@@ -96,17 +152,36 @@ class MapController:
         self._send_request_button.place(x=window_width-INFO_BOARD_WIDTH, y=550)
         self._response_text.place(x=window_width-INFO_BOARD_WIDTH, y=600)
         self._point_text.place(x=window_width - INFO_BOARD_WIDTH, y=650)
+        self._plan_button.place(x=window_width - INFO_BOARD_WIDTH, y=700)
 
     def create_map(self):
-        data = self._services.get_game_with_game_id()
-        list_actions = self._services.get_game_actions_with_game_id()
-        status_data = self._services.get_game_status_with_game_id()
+        self._network.cancel(key=SNAPSHOT_REQUEST)
+        self._turn_clock = TurnClock()
+        self.request_snapshot(callback=self.create_map_from_snapshot)
+
+    def create_map_from_snapshot(self, snapshot: GameSnapshot):
+        """Rebuild the board of the snapshot on the worker, the map is created when it is done."""
+        self._action_log.add(list_actions=snapshot.actions)
+        turn = snapshot.status.cur_turn
+        list_actions = self._action_log.get_turn_actions(turn=turn)
+        self._network.cancel(key=REBUILD_REQUEST)
+        self._network.submit(key=REBUILD_REQUEST,
+                             function=lambda: self._checkpoints.rebuild(field=snapshot.game.field,
+                                                                        list_actions=list_actions, turn=turn),
+                             callback=lambda board: self.create_map_from_board(snapshot=snapshot, board=board),
+                             error_callback=self.show_error,
+                             lane=REBUILD_REQUEST)
+
+    def create_map_from_board(self, snapshot: GameSnapshot, board: BoardState):
+        data = snapshot.game
+        status_data = snapshot.status
 
         self._turn = status_data.cur_turn
         self._turn_text.config(text=f"Turn: {str(self._turn)}")
         self.configure_turn_in_request_data()
 
-        self.create_map_from_server(data=data, list_actions=list_actions)
+        self.create_map_from_server(data=data, board=board)
+        self._is_map_created = True
         for side in data.sides:
             if side.team_id == self._team_id:
                 self._side = side.side
@@ -127,8 +202,9 @@ class MapController:
         if self._destroy_button:
             self._destroy_button.destroy()
         self.start()
+        self.restart_timer()
 
-    def create_map_from_server(self, data: GameResp, list_actions: List[GameActionsResp]):
+    def create_map_from_server(self, data: GameResp, board: BoardState):
         window_width = self._window.winfo_width()
         window_height = self._window.winfo_height()
         grid_width = data.field.width
@@ -139,33 +215,31 @@ class MapController:
 
         if self._my_map:
             self._my_map.delete()
-        self._my_map = Map(canvas=self._canvas, width=grid_width, height=grid_height)
-        self._my_map.init_map(data=data, window_width=window_width, window_height=window_height)
-
-        for i in range(0, len(list_actions)):
-            if self._turn >= list_actions[i].turn and i == len(list_actions) - 1 or \
-                    self._turn >= list_actions[i].turn != list_actions[i + 1].turn:
-                destroy_actions = [action for action in list_actions[i].actions if action.action == ActionType.DESTROY]
-                build_actions = [action for action in list_actions[i].actions if action.action == ActionType.BUILD]
-                move_actions = [action for action in list_actions[i].actions if action.action == ActionType.MOVE]
-                for action in destroy_actions:
-                    self._my_map.change_map_component_from_actions_response(child_action=action)
-                for action in build_actions:
-                    self._my_map.change_map_component_from_actions_response(child_action=action)
-                for action in move_actions:
-                    self._my_map.change_map_component_from_actions_response(child_action=action)
-                self._my_map.update_territory_status()
+        self._my_map = Map(canvas=self._canvas, width=grid_width, height=grid_height, render_mode=self._render_mode)
+        self._my_map.init_map_from_board(board=board, window_width=window_width, window_height=window_height)
 
     def update_map(self):
-        data = self._services.get_game_with_game_id()
-        list_actions = self._services.get_game_actions_with_game_id()
-        status_data = self._services.get_game_status_with_game_id()
+        if not self._is_map_created or self._network.is_in_flight(key=REBUILD_REQUEST):
+            # The placeholder map is not a board of the game, it is only updated once Create Map built one. The
+            # map being created already has the latest turn, or the next poll finds it.
+            return
+        self.request_snapshot(callback=self.update_map_from_snapshot)
+
+    def update_map_from_snapshot(self, snapshot: GameSnapshot):
+        self._action_log.add(list_actions=snapshot.actions)
+        data = snapshot.game
+        status_data = snapshot.status
+        if status_data.cur_turn < self._turn or not self._is_map_created \
+                or self._network.is_in_flight(key=REBUILD_REQUEST):
+            return
+        # A status poll sent before this snapshot can only report a turn that is already applied.
+        self._network.cancel(key=STATUS_REQUEST)
 
         self._turn = status_data.cur_turn
         self._turn_text.config(text=f"Turn: {str(self._turn)}")
         self.configure_turn_in_request_data()
 
-        self.update_map_from_server(data=data, list_actions=list_actions)
+        self.update_map_from_server(data=data, action_log=self._action_log)
         for side in data.sides:
             if side.team_id == self._team_id:
                 self._side = side.side
@@ -178,15 +252,40 @@ class MapController:
         self._request_data_text.insert(tk.END, pretty_json)
         self._time_remain = status_data.remaining
         self.start()
-
-    def update_map_from_server(self, data: GameResp, list_actions: List[GameActionsResp]):
+        self.restart_timer()
+
+    def request_snapshot(self, callback: Callable[[GameSnapshot], None]) -> bool:
+        """Fetch the game, the new actions and the status on the network worker and pass them to ``callback``.
+
+        Only the actions from the latest known turn on are asked for.
+        """
+        since_turn = self._action_log.latest_turn
+        known_ids = set(self._action_log.ids)
+        return self._network.submit(key=SNAPSHOT_REQUEST,
+                                    function=lambda: call_timed(lambda: asyncio.run(
+                                        self._async_services.get_game_snapshot(since_turn=since_turn,
+                                                                               known_ids=known_ids))),
+                                    callback=lambda result: self.on_snapshot(result=result, callback=callback),
+                                    error_callback=self.show_error)
+
+    def on_snapshot(self, result: (GameSnapshot, float, float), callback: Callable[[GameSnapshot], None]):
+        (snapshot, sent_at, received_at) = result
+        self._turn_clock.sync_game(time_per_turn=snapshot.game.time_per_turn, start_time=snapshot.game.start_time)
+        self._turn_clock.add_status(turn=snapshot.status.cur_turn, remaining=snapshot.status.remaining,
+                                    sent_at=sent_at, received_at=received_at)
+        callback(snapshot)
+
+    def show_error(self, error: Exception):
+        self._response_text.config(text=f"Error: {type(error).__name__}")
+
+    def update_map_from_server(self, data: GameResp, action_log: ActionLog):
         window_width = self._window.winfo_width()
         window_height = self._window.winfo_height()
         grid_width = data.field.width
         grid_height = data.field.height
 
         if not self._my_map:
-            self._my_map = Map(canvas=self._canvas, width=grid_width, height=grid_height)
+            self._my_map = Map(canvas=self._canvas, width=grid_width, height=grid_height, render_mode=self._render_mode)
             self._my_map.init_map(data=data, window_width=window_width, window_height=window_height)
 
         if (self._side is Side.A and self._turn % 2 == 0) or \
@@ -202,19 +301,27 @@ class MapController:
                 self._build_button.destroy()
             if self._destroy_button:
                 self._destroy_button.destroy()
-        for i in range(0, len(list_actions)):
-            if (self._turn == list_actions[i].turn and i == len(list_actions) - 1) or \
-                    (self._turn == list_actions[i].turn and list_actions[i].turn != list_actions[i+1].turn):
-                destroy_actions = [action for action in list_actions[i].actions if action.action == ActionType.DESTROY]
-                build_actions = [action for action in list_actions[i].actions if action.action == ActionType.BUILD]
-                move_actions = [action for action in list_actions[i].actions if action.action == ActionType.MOVE]
-                for action in destroy_actions:
-                    self._my_map.change_map_component_from_actions_response(child_action=action)
-                for action in build_actions:
-                    self._my_map.change_map_component_from_actions_response(child_action=action)
-                for action in move_actions:
-                    self._my_map.change_map_component_from_actions_response(child_action=action)
-                self._my_map.update_territory_status()
+        # Every turn missed since the last update is applied in order, turns already on the board are skipped.
+        for turn in range(self._my_map.board.turn + 1, self._turn + 1):
+            actions = action_log.get_latest_actions(turn=turn)
+            if actions is None:
+                continue
+            self._my_map.apply_turn(actions=actions.actions, turn=actions.turn)
+            if self._checkpoints.is_due(turn=self._my_map.board.turn):
+                self.save_checkpoint(board=self._my_map.board.fork(), field=data.field,
+                                     list_actions=action_log.get_turn_actions(turn=turn))
+
+    def save_checkpoint(self, board: BoardState, field: GameResp.Field, list_actions: list[GameActionsResp]):
+        """Hash the history and write the checkpoint on the worker, in the lane of the rebuild that reads them.
+
+        ``board`` is a fork, the map keeps changing its own board while the worker pickles this one.
+        """
+        self._network.submit(key=f"{CHECKPOINT_REQUEST}:{board.turn}",
+                             function=lambda: self._checkpoints.save_if_due(board=board, field=field,
+                                                                            list_actions=list_actions),
+                             callback=lambda result: None,
+                             error_callback=self.show_error,
+                             lane=REBUILD_REQUEST)
 
     def start(self):
         window_width = self._window.winfo_width()
@@ -267,6 +374,32 @@ class MapController:
         self._request_data_text.delete("1.0", tk.END)
         self._request_data_text.insert(tk.END, pretty_json)
 
+    def auto_plan(self):
+        """Plan until the release time of the requested turn, the actions are sent as soon as the plan is done."""
+        deadline = self._turn_clock.get_release_time(turn=self._request_data.turn, safety_margin=self._submit_margin)
+        if deadline is None:
+            deadline = time.monotonic() + self._time_remain - PLAN_SAFETY_MARGIN
+        deadline = max(deadline, time.monotonic() + PLAN_MIN_TIME)
+        self._plan_turn = self._request_data.turn
+        self._planner.start(board=self._my_map.board.copy(), side=self._side, deadline=deadline)
+        self._plan_button.config(state=tk.DISABLED)
+        self.check_plan()
+
+    def check_plan(self):
+        is_done = self._planner.poll()
+        self._request_data.actions = self._planner.get_best_actions()
+        self.configure_turn_in_request_data()
+        data = self._request_data.dict()
+        pretty_json = json.dumps(data, indent=1)
+        self._request_data_text.delete("1.0", tk.END)
+        self._request_data_text.insert(tk.END, pretty_json)
+        if is_done:
+            self._plan_button.config(state=tk.NORMAL)
+            if self._plan_turn == self._request_data.turn:
+                self.send_data()
+        else:
+            self._plan_button.after(100, self.check_plan)
+
     def configure_turn_in_request_data(self):
         self._request_data.turn = self._turn + 1
         if self._side is Side.A and self._request_data.turn % 2 == 1:
@@ -301,27 +434,68 @@ class MapController:
             self._state = State.CHOOSE_DIRECTION
 
 
+    def close(self):
+        self._planner.shutdown()
+        self._network.stop()
+
+    def restart_timer(self):
+        if self._timer_job is not None:
+            self._time_remain_text.after_cancel(self._timer_job)
+        self.update_timer()
+
     def update_timer(self):
-        if self._time_remain is None:
+        """Show the time left in the turn and poll the status when the turn clock says so.
+
+        The next tick is at the next whole second of the countdown or at the next poll, whichever comes first.
+        """
+        self._timer_job = None
+        now = time.monotonic()
+        remaining = self._turn_clock.get_remaining(turn=self._turn, now=now)
+        if remaining is None:
             self._time_remain_text.config(text="Time remaining: None")
-            return
-        if self._time_remain >= 1:
-            self._time_remain_text.config(text=f"Time remaining: {self._time_remain}")
-            self._time_remain_text.after(1000, self.update_timer)
-            self._time_remain -= 1
-        elif self._time_remain < 1:
-            status_data = self._services.get_game_status_with_game_id()
-            if self._turn < status_data.cur_turn:
-                self.update_map()
-                self._time_remain_text.after(200, self.update_timer)
-            else:
-                self._time_remain_text.after(500, self.update_timer)
+        else:
+            self._time_remain = remaining
+            self._time_remain_text.config(text=f"Time remaining: {math.ceil(remaining)}")
+        poll_time = self._turn_clock.get_poll_time(turn=self._turn, last_poll=self._last_poll, now=now)
+        if now >= poll_time:
+            # A poll still in flight is not sent again, errors are retried on the next poll.
+            if self._network.submit(key=STATUS_REQUEST,
+                                    function=lambda: call_timed(self._services.get_game_status_with_game_id),
+                                    callback=self.on_status):
+                self._last_poll = now
+            poll_time = max(self._turn_clock.get_poll_time(turn=self._turn, last_poll=self._last_poll, now=now),
+                            now + MIN_POLL_INTERVAL)
+        next_time = poll_time
+        if remaining:
+            next_time = min(next_time, now + (remaining % 1 or 1))
+        self._timer_job = self._time_remain_text.after(max(1, int((next_time - now) * 1000)), self.update_timer)
+
+    def on_status(self, result: (GameStatusResp, float, float)):
+        (status_data, sent_at, received_at) = result
+        self._turn_clock.add_status(turn=status_data.cur_turn, remaining=status_data.remaining, sent_at=sent_at,
+                                    received_at=received_at)
+        if status_data.cur_turn is not None and self._turn < status_data.cur_turn:
+            self.update_map()
 
     def send_data(self):
         json_text = self._request_data_text.get("1.0", tk.END)
         data = json.loads(json_text)
-        resp = self._services.post_game_actions(GameActionsReq(**data))
-        self._response_text.config(text=str(resp))
+        request_data = GameActionsReq(**data)
+        illegal_actions = find_illegal_actions(board=self._my_map.board, side=self._side,
+                                               actions=request_data.actions or [])
+        if illegal_actions:
+            craftsman_ids = ", ".join(str(action.craftsman_id) for action in illegal_actions)
+            self._response_text.config(text=f"Illegal action: {craftsman_ids}")
+            return
+        # Actions sent again replace the previous ones, those are not sent if the worker has not started them.
+        # They have their own lane, so they never wait behind a slow status or snapshot request.
+        self._network.cancel(key=ACTIONS_REQUEST)
+        self._network.submit(key=ACTIONS_REQUEST,
+                             function=lambda: self._services.post_game_actions(request_data),
+                             callback=lambda resp: self._response_text.config(text=str(resp)),
+                             error_callback=self.show_error,
+                             lane=ACTIONS_REQUEST)
+        self._response_text.config(text="Sending...")
 
     def on_key_press(self, keysym: str):
         accepted_key_direction = ["Left", "Right", "Up", "Down"]
@@ -338,6 +512,11 @@ class MapController:
             self._send_request_button.invoke()
             return
 
+        if keysym in ["Prior", "Next"]:
+            self.zoom(zoom_in=keysym == "Prior", x=int((window_width - INFO_BOARD_WIDTH) / 2),
+                      y=int(window_height / 2))
+            return
+
         if self._state == State.CHOOSE_ACTION:
             if keysym == "q" and self._stay_button and self._stay_button.winfo_exists():
                 self._stay_button.invoke()
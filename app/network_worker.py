@@ -0,0 +1,108 @@
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable, Optional
+
+from app.helpers import NETWORK_DRAIN_INTERVAL
+
+DEFAULT_LANE = "default"
+
+
+class NetworkWorker:
+    """Runs the requests to the server on background threads so they never block the Tk mainloop.
+
+    Every lane is one thread serving its requests in order, so a request in its own lane never waits behind
+    slow requests of another one. Results go back through a queue drained with ``after``, so callbacks always
+    run on the Tk thread. A key that is already in flight is not submitted again, and the result of a cancelled
+    key is dropped when it arrives.
+    """
+
+    def __init__(self, widget: tk.Misc, interval: int = NETWORK_DRAIN_INTERVAL):
+        self._widget: tk.Misc = widget
+        self._interval: int = interval
+        self._lanes: dict[str, queue.Queue] = {}
+        self._results: queue.Queue = queue.Queue()
+        self._in_flight: dict[str, int] = {}
+        self._next_ticket: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._drain_job: str = None
+
+    def is_in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._in_flight
+
+    def is_current(self, key: str, ticket: int) -> bool:
+        with self._lock:
+            return self._in_flight.get(key) == ticket
+
+    def submit(self, key: str, function: Callable[[], Any], callback: Callable[[Any], None],
+               error_callback: Optional[Callable[[Exception], None]] = None, lane: str = DEFAULT_LANE) -> bool:
+        """Run ``function`` in ``lane`` and pass its result to ``callback``, unless ``key`` is in flight."""
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._next_ticket += 1
+            ticket = self._next_ticket
+            self._in_flight[key] = ticket
+        self.get_lane(lane=lane).put((key, ticket, function, callback, error_callback))
+        self.schedule_drain()
+        return True
+
+    def get_lane(self, lane: str) -> queue.Queue:
+        if lane not in self._lanes:
+            self._lanes[lane] = queue.Queue()
+            threading.Thread(target=self.run, args=(self._lanes[lane],), name=f"network-{lane}", daemon=True).start()
+        return self._lanes[lane]
+
+    def cancel(self, key: str):
+        """Forget the request of ``key``, it is skipped if it has not started and its result is dropped."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def run(self, requests: queue.Queue):
+        while True:
+            request = requests.get()
+            if request is None:
+                return
+            (key, ticket, function, callback, error_callback) = request
+            if not self.is_current(key=key, ticket=ticket):
+                continue
+            try:
+                (result, error) = (function(), None)
+            except Exception as exception:
+                (result, error) = (None, exception)
+            self._results.put((key, ticket, result, error, callback, error_callback))
+
+    def schedule_drain(self):
+        if self._drain_job is None:
+            self._drain_job = self._widget.after(self._interval, self.drain)
+
+    def drain(self):
+        self._drain_job = None
+        while True:
+            try:
+                (key, ticket, result, error, callback, error_callback) = self._results.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                if self._in_flight.get(key) != ticket:
+                    continue
+                del self._in_flight[key]
+            if error is None:
+                callback(result)
+            elif error_callback is not None:
+                error_callback(error)
+        with self._lock:
+            is_pending = bool(self._in_flight)
+        if is_pending:
+            self.schedule_drain()
+
+    def stop(self):
+        with self._lock:
+            self._in_flight.clear()
+        for requests in self._lanes.values():
+            requests.put(None)
+        self._lanes.clear()
+        if self._drain_job is not None:
+            self._widget.after_cancel(self._drain_job)
+            self._drain_job = None
@@ -0,0 +1,197 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import List, Optional
+
+from app.board_state import BoardState
+from app.helpers import ActionType, Owner, Side, ACTION_LIST
+from app.legal_actions import get_legal_action_indexes
+from app.models import GameActionsReq
+from app.zobrist import TranspositionTable
+
+SEARCH_SLICE = 0.5
+RESULT_LATENCY = 0.05
+SEARCH_DEPTH = 4
+ROLLOUT_DEPTH = 6
+EXPLORATION = 1.4
+EVALUATION_SCALE = 20
+TRANSPOSITION_TABLE_SIZE = 100000
+
+
+class Node:
+    """Decoupled UCT node: every craftsman of the side to move keeps its own statistics per action.
+
+    The node keeps the board it stands for, so walking down the tree does not recompute territory.
+    """
+
+    def __init__(self, board: BoardState, owner: int):
+        self.board: BoardState = board
+        self.owner: int = owner
+        self.craftsmen: list[int] = [craftsman for craftsman in range(len(board.craftsman_ids))
+                                     if board.craftsman_sides[craftsman] == owner]
+        self.legal_actions: list[list[int]] = [get_legal_action_indexes(board=board, craftsman=craftsman)
+                                               for craftsman in self.craftsmen]
+        self.visits: int = 0
+        self.action_visits: list[list[int]] = [[0] * len(ACTION_LIST) for _ in self.craftsmen]
+        self.action_values: list[list[float]] = [[0.0] * len(ACTION_LIST) for _ in self.craftsmen]
+        self.children: dict[tuple, Node] = {}
+
+    def select(self, rng: random.Random) -> tuple:
+        joint_action = []
+        for legal_actions, visits, values in zip(self.legal_actions, self.action_visits, self.action_values):
+            unvisited = [action for action in legal_actions if visits[action] == 0]
+            if unvisited:
+                joint_action.append(rng.choice(unvisited))
+                continue
+            log_visits = math.log(self.visits)
+            joint_action.append(max(legal_actions, key=lambda action: values[action] / visits[action]
+                                    + EXPLORATION * math.sqrt(log_visits / visits[action])))
+        return tuple(joint_action)
+
+    def update(self, joint_action: tuple, reward: float):
+        self.visits += 1
+        for i, action in enumerate(joint_action):
+            self.action_visits[i][action] += 1
+            self.action_values[i][action] += reward
+
+
+def other_owner(owner: int) -> int:
+    return Owner.B if owner == Owner.A else Owner.A
+
+
+def play(board: BoardState, craftsmen: list[int], joint_action: tuple):
+    board.resolve_turn(actions={craftsman: ACTION_LIST[action] for craftsman, action in zip(craftsmen, joint_action)},
+                       turn=board.turn + 1)
+    board.update_territory()
+
+
+def play_random(board: BoardState, owner: int, rng: random.Random):
+    actions = {}
+    for craftsman in range(len(board.craftsman_ids)):
+        if board.craftsman_sides[craftsman] == owner:
+            actions[craftsman] = ACTION_LIST[rng.choice(get_legal_action_indexes(board=board, craftsman=craftsman))]
+    board.resolve_turn(actions=actions, turn=board.turn + 1)
+    board.update_territory()
+
+
+def evaluate(board: BoardState, owner: int) -> float:
+    (point_a, point_b) = board.calculate_point()
+    difference = point_a - point_b if owner == Owner.A else point_b - point_a
+    return 0.5 + 0.5 * math.tanh(difference / EVALUATION_SCALE)
+
+
+def search(board: BoardState, owner: int, duration: float, seed: int) -> (list[int], list, list):
+    """Run MCTS from ``board`` with ``owner`` to move for ``duration`` seconds.
+
+    Returns the craftsmen of ``owner`` with the visit count and total reward of every action at the root. Every
+    call builds a new tree, only the root statistics are kept by the caller.
+    """
+    rng = random.Random(seed)
+    root = Node(board=board, owner=owner)
+    nodes = TranspositionTable(max_size=TRANSPOSITION_TABLE_SIZE)
+    nodes.put(key=board.hash, value=root)
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        node = root
+        path = []
+        for _ in range(SEARCH_DEPTH):
+            joint_action = node.select(rng=rng)
+            path.append((node, joint_action))
+            child = node.children.get(joint_action)
+            is_new = False
+            if child is None:
+                state = node.board.fork()
+                play(board=state, craftsmen=node.craftsmen, joint_action=joint_action)
+                # Different joint actions often reach the same position, share one node for all of them.
+                child = nodes.get(key=state.hash)
+                if child is None:
+                    child = Node(board=state, owner=other_owner(node.owner))
+                    nodes.put(key=state.hash, value=child)
+                    is_new = True
+                node.children[joint_action] = child
+            node = child
+            if is_new:
+                break
+        state = node.board.fork()
+        next_owner = node.owner
+        for _ in range(ROLLOUT_DEPTH):
+            play_random(board=state, owner=next_owner, rng=rng)
+            next_owner = other_owner(next_owner)
+        reward = evaluate(board=state, owner=owner)
+        for node, joint_action in path:
+            node.update(joint_action=joint_action, reward=reward if node.owner == owner else 1 - reward)
+    return root.craftsmen, root.action_visits, root.action_values
+
+
+class Planner:
+    """Anytime root-parallel MCTS over the joint actions of one side.
+
+    Every worker process searches for a short slice and returns its root statistics, which are summed until the
+    deadline. Slices are independent restarts with their own seed: the trees stay in the worker processes, so the
+    sum is the same as searching with more, shorter root-parallel trees. ``get_best_actions`` can be called at any
+    moment and returns the most visited action of every craftsman found so far.
+    """
+
+    def __init__(self, processes: Optional[int] = None):
+        self._processes: int = processes or os.cpu_count() or 1
+        self._executor: ProcessPoolExecutor = None
+        self._futures: list[Future] = []
+        self._board: BoardState = None
+        self._owner: int = Owner.A
+        self._deadline: float = 0
+        self._craftsmen: list[int] = []
+        self._action_visits: list[list[int]] = []
+        self._action_values: list[list[float]] = []
+
+    def start(self, board: BoardState, side: Side, deadline: float):
+        """Start searching from ``board`` for ``side`` until ``deadline``, a ``time.monotonic()`` value."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._processes)
+        self._board = board
+        self._owner = Owner.A if side == Side.A else Owner.B
+        self._deadline = deadline
+        self._craftsmen = [craftsman for craftsman in range(len(board.craftsman_ids))
+                           if board.craftsman_sides[craftsman] == self._owner]
+        self._action_visits = [[0] * len(ACTION_LIST) for _ in self._craftsmen]
+        self._action_values = [[0.0] * len(ACTION_LIST) for _ in self._craftsmen]
+        self._futures = []
+        for _ in range(self._processes):
+            self.submit()
+
+    def submit(self) -> bool:
+        duration = min(SEARCH_SLICE, self._deadline - RESULT_LATENCY - time.monotonic())
+        if duration <= 0:
+            return False
+        self._futures.append(self._executor.submit(search, self._board, self._owner, duration,
+                                                   random.getrandbits(32)))
+        return True
+
+    def poll(self) -> bool:
+        """Merge the finished slices, start new ones while there is time left and return True when done."""
+        for future in [future for future in self._futures if future.done()]:
+            self._futures.remove(future)
+            (craftsmen, action_visits, action_values) = future.result()
+            for i in range(len(craftsmen)):
+                for action in range(len(ACTION_LIST)):
+                    self._action_visits[i][action] += action_visits[i][action]
+                    self._action_values[i][action] += action_values[i][action]
+            self.submit()
+        if time.monotonic() >= self._deadline:
+            self._futures = []
+        return not self._futures
+
+    def get_best_actions(self) -> List[GameActionsReq.ChildAction]:
+        actions = []
+        for craftsman, visits in zip(self._craftsmen, self._action_visits):
+            (action, action_param) = ACTION_LIST[max(range(len(ACTION_LIST)), key=lambda i: visits[i])]
+            actions.append(GameActionsReq.ChildAction(
+                action=action, action_param=None if action == ActionType.STAY else action_param,
+                craftsman_id=self._board.craftsman_ids[craftsman]))
+        return actions
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,67 @@
+import tkinter as tk
+from typing import Iterable
+
+from PIL import ImageTk
+
+from app.board_image import BoardImage
+from app.board_state import BoardState
+from app.helpers import MAP_TAG, BOARD_IMAGE_TAG
+
+RASTER_MAX_SIZE = 4096
+
+
+class RasterRenderer:
+    """Shows a ``BoardImage`` as a single canvas item.
+
+    After a turn only the squares that changed are drawn again, then the image is copied to the canvas once.
+    """
+
+    def __init__(self, canvas: tk.Canvas):
+        self._canvas: tk.Canvas = canvas
+        self._board_image: BoardImage = BoardImage()
+        self._photo: ImageTk.PhotoImage = None
+        self._item: int = None
+
+    def render(self, board: BoardState, rect_width: int, rect_height: int, x: int = 0, y: int = 0):
+        """Draw the whole board with its top left corner at (``x``, ``y``) on the canvas."""
+        if rect_width <= 0 or rect_height <= 0:
+            return
+        self._photo = ImageTk.PhotoImage(self._board_image.render(board=board, rect_width=rect_width,
+                                                                  rect_height=rect_height))
+        if self._item is None or not self._canvas.find_withtag(self._item):
+            self._item = self._canvas.create_image(x, y, image=self._photo, anchor=tk.NW,
+                                                   tags=(MAP_TAG, BOARD_IMAGE_TAG))
+            self._canvas.tag_lower(self._item)
+        else:
+            self._canvas.itemconfig(self._item, image=self._photo)
+            self._canvas.coords(self._item, x, y)
+
+    def update(self, indexes: Iterable[int]):
+        """Draw again the squares in ``indexes`` and copy the box around them to the shown image."""
+        if self._photo is None:
+            return
+        boxes = []
+        for index in indexes:
+            self._board_image.draw_square(index=index)
+            boxes.append(self._board_image.get_square_box(index=index))
+        if not boxes:
+            return
+        box = (min(box[0] for box in boxes), min(box[1] for box in boxes),
+               max(box[2] for box in boxes), max(box[3] for box in boxes))
+        # Pasting the whole image takes longer than a frame on large boards, only the changed part is copied.
+        patch = ImageTk.PhotoImage(self._board_image.image.crop(box))
+        self._canvas.tk.call(str(self._photo), 'copy', str(patch), '-to', box[0], box[1])
+
+    def highlight(self, index: int):
+        self._board_image.highlighted.add(index)
+        self.update(indexes=[index])
+
+    def clear_highlight(self, index: int):
+        if index in self._board_image.highlighted:
+            self._board_image.highlighted.discard(index)
+            self.update(indexes=[index])
+
+    def clear_highlights(self):
+        highlighted = self._board_image.highlighted
+        self._board_image.highlighted = set()
+        self.update(indexes=highlighted)
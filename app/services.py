@@ -1,47 +1,129 @@
+import asyncio
 import os
+from typing import NamedTuple, Optional
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from models import GameActionsReq, GameActionsResp, GameActionsStatusResp, GameStatusResp, GameResp
+from app.models import GameActionsReq, GameActionsResp, GameActionsStatusResp, GameStatusResp, GameResp
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ''))
 load_dotenv(os.path.join(BASE_DIR, '../.env'))
 
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.2
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+POOL_SIZE = 4
+
+
+class GameSnapshot(NamedTuple):
+    game: GameResp
+    actions: list[GameActionsResp]
+    status: GameStatusResp
+
+
+def create_session() -> requests.Session:
+    """Session keeping its connections alive, idempotent GET requests are retried with backoff."""
+    retry = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF_FACTOR, status_forcelist=RETRY_STATUS_CODES,
+                  allowed_methods=frozenset(['GET']), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
 
 class Service:
+    """Requests to the game server over one pooled session.
+
+    The game rarely changes during a match, so it is revalidated with ``If-None-Match``/``If-Modified-Since``
+    and the parsed response is reused when the server answers 304.
+    """
 
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
         self._game_id = os.getenv('GAME_ID', 0)
         self._url = os.getenv('URL', '')
         self._token = os.getenv('TOKEN', '')
         self._headers = {
             'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
             'Authorization': self._token
         }
+        self._timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        self._session: requests.Session = session or create_session()
+        self._session.headers.update(self._headers)
+        self._game: Optional[GameResp] = None
+        self._game_validators: dict = {}
+
+    def close(self):
+        self._session.close()
 
     def get_game_with_game_id(self) -> GameResp:
-        response = requests.get(self._url + f"/games/{self._game_id}",
-                                headers=self._headers)
-        return GameResp(**response.json())
+        headers = {}
+        if self._game is not None:
+            if 'ETag' in self._game_validators:
+                headers['If-None-Match'] = self._game_validators['ETag']
+            if 'Last-Modified' in self._game_validators:
+                headers['If-Modified-Since'] = self._game_validators['Last-Modified']
+        response = self._session.get(self._url + f"/games/{self._game_id}",
+                                     headers=headers,
+                                     timeout=self._timeout)
+        if response.status_code == requests.codes.not_modified and self._game is not None:
+            return self._game
+        game = GameResp(**response.json())
+        self._game_validators = {key: response.headers[key] for key in ('ETag', 'Last-Modified')
+                                 if key in response.headers}
+        self._game = game if self._game_validators else None
+        return game
 
     def get_game_status_with_game_id(self) -> GameStatusResp:
-        response = requests.get(self._url + f"/games/{self._game_id}/status",
-                                headers=self._headers)
+        response = self._session.get(self._url + f"/games/{self._game_id}/status",
+                                     timeout=self._timeout)
         return GameStatusResp(**response.json())
 
-    def get_game_actions_with_game_id(self) -> list[GameActionsResp]:
-        response = requests.get(self._url + f"/games/{self._game_id}/actions",
-                                headers=self._headers)
+    def get_game_actions_with_game_id(self, since_turn: Optional[int] = None,
+                                      known_ids: Optional[set] = None) -> list[GameActionsResp]:
+        """Return the actions of the game.
+
+        ``since_turn`` asks the server only for the actions from that turn on, a server that does not support it
+        returns every action. Actions whose id is in ``known_ids`` are skipped without being parsed.
+        """
+        params = {} if since_turn is None else {'since_turn': since_turn}
+        response = self._session.get(self._url + f"/games/{self._game_id}/actions",
+                                     params=params,
+                                     timeout=self._timeout)
         list_resp = []
         if type(response.json()) is list:
             for actions in response.json():
+                if known_ids and actions.get('id') in known_ids:
+                    continue
                 list_resp.append(GameActionsResp(**actions))
         return list_resp
 
     def post_game_actions(self, game_actions_req: GameActionsReq) -> int:
         data = game_actions_req.dict()
-        response = requests.post(self._url + f"/games/{self._game_id}/actions",
-                                 json=data,
-                                 headers=self._headers)
+        response = self._session.post(self._url + f"/games/{self._game_id}/actions",
+                                      json=data,
+                                      timeout=self._timeout)
         return response.status_code
+
+
+class AsyncService:
+    """Runs the requests of a ``Service`` concurrently, each one in a thread of the event loop executor."""
+
+    def __init__(self, service: Service):
+        self._service: Service = service
+
+    async def get_game_snapshot(self, since_turn: Optional[int] = None,
+                                known_ids: Optional[set] = None) -> GameSnapshot:
+        """Fetch the game, its actions and its status at once, it costs the latency of the slowest request."""
+        (game, actions, status) = await asyncio.gather(
+            asyncio.to_thread(self._service.get_game_with_game_id),
+            asyncio.to_thread(self._service.get_game_actions_with_game_id, since_turn=since_turn,
+                              known_ids=set(known_ids or ())),
+            asyncio.to_thread(self._service.get_game_status_with_game_id))
+        return GameSnapshot(game=game, actions=actions, status=status)
@@ -0,0 +1,44 @@
+from typing import List, Union
+
+from app.board_state import BoardState
+from app.models import GameResp, GameActionsReq, GameActionsResp
+
+
+def create_board(field: GameResp.Field) -> BoardState:
+    board = BoardState(width=field.width, height=field.height)
+    board.load_field(field=field)
+    return board
+
+
+def apply_turn(board: BoardState, actions: Union[GameActionsReq, GameActionsResp]) -> set[int]:
+    """Apply one turn in place and return the squares whose wall or territory changed."""
+    changed = set(board.apply_turn(actions=actions.actions or [], turn=actions.turn))
+    changed.update(board.update_territory())
+    return changed
+
+
+def next_state(board: BoardState, actions: Union[GameActionsReq, GameActionsResp]) -> BoardState:
+    """Return the state after ``actions`` without changing ``board``."""
+    board = board.fork()
+    apply_turn(board=board, actions=actions)
+    return board
+
+
+def replay(field: GameResp.Field, list_actions: List[GameActionsResp], turn: int) -> BoardState:
+    """Rebuild the state at ``turn`` from the action history.
+
+    When a team sends several actions for the same turn only the last one is used, like
+    ``MapController.create_map_from_server``.
+    """
+    board = create_board(field=field)
+    for actions in latest_actions_by_turn(list_actions=list_actions, turn=turn):
+        apply_turn(board=board, actions=actions)
+    return board
+
+
+def latest_actions_by_turn(list_actions: List[GameActionsResp], turn: int) -> List[GameActionsResp]:
+    latest = {}
+    for actions in list_actions:
+        if actions.turn <= turn:
+            latest[actions.turn] = actions
+    return [latest[key] for key in sorted(latest)]
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+SPRITE_CACHE_SIZES = 4
+
+
+class SpriteCache:
+    """Images resized to the cell size, shared by every object that displays the same file.
+
+    Every file is decoded once. Only the ``max_sizes`` most recently used sizes are kept, objects that still
+    display an evicted image keep their own reference to it.
+    """
+
+    def __init__(self, max_sizes: int = SPRITE_CACHE_SIZES):
+        self._max_sizes: int = max_sizes
+        self._images: dict[str, Image.Image] = {}
+        self._sprites: OrderedDict = OrderedDict()
+
+    def get_image(self, image_path: str) -> Image.Image:
+        if image_path not in self._images:
+            image = Image.open(image_path)
+            image.load()
+            self._images[image_path] = image
+        return self._images[image_path]
+
+    def get_sprite(self, image_path: str, width: int, height: int) -> ImageTk.PhotoImage:
+        size = (max(1, int(width)), max(1, int(height)))
+        sprites = self._sprites.get(size)
+        if sprites is None:
+            sprites = {}
+            self._sprites[size] = sprites
+            if len(self._sprites) > self._max_sizes:
+                self._sprites.popitem(last=False)
+        self._sprites.move_to_end(size)
+        if image_path not in sprites:
+            sprites[image_path] = ImageTk.PhotoImage(self.get_image(image_path=image_path).resize(size))
+        return sprites[image_path]
+
+    def clear(self):
+        self._images.clear()
+        self._sprites.clear()
+
+
+SPRITE_CACHE = SpriteCache()
+
+
+def get_sprite(image_path: str, width: int, height: int) -> ImageTk.PhotoImage:
+    return SPRITE_CACHE.get_sprite(image_path=image_path, width=width, height=height)
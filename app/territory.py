@@ -0,0 +1,135 @@
+from collections import deque
+
+
+class Territory:
+    """Close territory of one side.
+
+    A square is close territory when it is not a wall of the side and can not reach the border of the map
+    without crossing a wall of the side. Squares are indexed by ``x * height + y``, the same order as
+    ``Map._point[x][y]``.
+    """
+
+    def __init__(self, width: int, height: int):
+        self._width: int = width
+        self._height: int = height
+        self._walls: bytearray = bytearray(width * height)
+        self._outside: bytearray = bytearray(width * height)
+
+    def is_close(self, x: int, y: int) -> bool:
+        index = x * self._height + y
+        return not self._walls[index] and not self._outside[index]
+
+    def copy(self) -> 'Territory':
+        territory = Territory(width=self._width, height=self._height)
+        territory._walls = bytearray(self._walls)
+        territory._outside = bytearray(self._outside)
+        return territory
+
+    def update(self, walls: bytearray):
+        self._walls = bytearray(walls)
+        self._outside = bytearray(self._width * self._height)
+        self.flood(starts=self.border_indexes())
+
+    def set_wall(self, x: int, y: int, is_wall: bool) -> list[int]:
+        """Change one square and return the indexes whose close status changed.
+
+        Only the regions bounded by the square are visited, so the cost depends on the size of the change
+        instead of the size of the map.
+        """
+        index = x * self._height + y
+        if is_wall:
+            return self.add_wall(index=index)
+        return self.remove_wall(index=index)
+
+    def add_wall(self, index: int) -> list[int]:
+        if self._walls[index]:
+            return []
+        was_outside = self._outside[index]
+        self._walls[index] = 1
+        self._outside[index] = 0
+        if not was_outside:
+            return [index]
+        changed = []
+        connected = set()
+        for neighbor in self.neighbors(index):
+            if not self._outside[neighbor] or neighbor in connected:
+                continue
+            region, is_connected = self.find_region(start=neighbor, connected=connected)
+            if is_connected:
+                connected.update(region)
+                continue
+            for square in region:
+                self._outside[square] = 0
+            changed.extend(region)
+        return changed
+
+    def remove_wall(self, index: int) -> list[int]:
+        if not self._walls[index]:
+            return []
+        self._walls[index] = 0
+        if not self.is_border(index=index) and not any(self._outside[n] for n in self.neighbors(index)):
+            return [index]
+        return [square for square in self.flood(starts=[index]) if square != index]
+
+    def find_region(self, start: int, connected: set) -> (list[int], bool):
+        """Collect the outside squares linked to ``start``, stopping as soon as the border is reached."""
+        visited = {start}
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            if index in connected or self.is_border(index=index):
+                return list(visited), True
+            for neighbor in self.neighbors(index):
+                if self._outside[neighbor] and neighbor not in visited:
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        return list(visited), False
+
+    def is_border(self, index: int) -> bool:
+        x, y = divmod(index, self._height)
+        return x == 0 or y == 0 or x == self._width - 1 or y == self._height - 1
+
+    def border_indexes(self) -> list[int]:
+        last_x = self._width - 1
+        last_y = self._height - 1
+        indexes = []
+        for x in range(self._width):
+            indexes.append(x * self._height)
+            if last_y > 0:
+                indexes.append(x * self._height + last_y)
+        for y in range(1, last_y):
+            indexes.append(y)
+            if last_x > 0:
+                indexes.append(last_x * self._height + y)
+        return indexes
+
+    def neighbors(self, index: int) -> list[int]:
+        x, y = divmod(index, self._height)
+        result = []
+        if x > 0:
+            result.append(index - self._height)
+        if x < self._width - 1:
+            result.append(index + self._height)
+        if y > 0:
+            result.append(index - 1)
+        if y < self._height - 1:
+            result.append(index + 1)
+        return result
+
+    def flood(self, starts: list[int]) -> list[int]:
+        walls = self._walls
+        outside = self._outside
+        marked = []
+        queue = deque()
+        for index in starts:
+            if not walls[index] and not outside[index]:
+                outside[index] = 1
+                queue.append(index)
+        while queue:
+            index = queue.popleft()
+            marked.append(index)
+            for neighbor in self.neighbors(index):
+                if not walls[neighbor] and not outside[neighbor]:
+                    outside[neighbor] = 1
+                    queue.append(neighbor)
+        return marked
@@ -0,0 +1,33 @@
+from app.action_log import ActionLog
+from app.models import GameActionsResp
+
+
+def test_add_skips_known_actions():
+    action_log = ActionLog()
+    first = [GameActionsResp(id=1, turn=1, actions=[]), GameActionsResp(id=2, turn=2, actions=[])]
+    assert action_log.add(list_actions=first) == first
+    later = GameActionsResp(id=3, turn=2, actions=[])
+    assert action_log.add(list_actions=first + [later]) == [later]
+    assert action_log.ids == {1, 2, 3}
+    assert action_log.latest_turn == 2
+
+
+def test_actions_without_id_are_keyed_by_turn_team_and_time():
+    action_log = ActionLog()
+    actions = GameActionsResp(turn=3, team_id=7, created_time="2024-01-01T00:00:00", actions=[])
+    assert action_log.add(list_actions=[actions]) == [actions]
+    assert action_log.add(list_actions=[actions.copy()]) == []
+    other = actions.copy(update={"team_id": 8})
+    assert action_log.add(list_actions=[other]) == [other]
+
+
+def test_latest_actions_of_turn_are_used():
+    action_log = ActionLog()
+    assert action_log.latest_turn is None
+    assert action_log.get_latest_actions(turn=1) is None
+    list_actions = [GameActionsResp(id=i, turn=turn, actions=[]) for i, turn in enumerate([3, 1, 3, 2, 5])]
+    action_log.add(list_actions=list_actions)
+    assert action_log.get_latest_actions(turn=3) is list_actions[2]
+    assert action_log.get_latest_actions(turn=4) is None
+    assert action_log.get_turn_actions(turn=4) == [list_actions[1], list_actions[3], list_actions[2]]
+    assert action_log.latest_turn == 5
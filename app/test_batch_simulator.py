@@ -0,0 +1,27 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.batch_simulator import BatchSimulator
+from app.helpers import ACTION_LIST
+from app.simulator import create_board
+
+
+@pytest.mark.parametrize("width, height", [(7, 9), (3, 70)])
+def test_step_matches_board_state(make_random_field, width, height):
+    rng = random.Random(width)
+    board = create_board(field=make_random_field(rng=rng, width=width, height=height, craftsman_count=3))
+    boards = [board.copy() for _ in range(4)]
+    simulator = BatchSimulator(board=board, size=len(boards))
+    for turn in range(1, 60):
+        actions = np.array([[rng.randrange(len(ACTION_LIST)) for _ in board.craftsman_ids] for _ in boards])
+        simulator.step(actions=actions)
+        for n, state in enumerate(boards):
+            state.resolve_turn(actions={craftsman: ACTION_LIST[action] for craftsman, action in enumerate(actions[n])},
+                               turn=turn)
+            state.update_territory()
+            assert simulator.walls[n].ravel().tolist() == list(state.walls)
+            assert simulator.territory[n].ravel().tolist() == list(state.territory)
+            assert simulator.craftsman_positions[n].tolist() == state.craftsman_positions.tolist()
+            assert tuple(simulator.calculate_point()[n]) == state.calculate_point()
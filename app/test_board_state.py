@@ -0,0 +1,84 @@
+import random
+
+from app.board_state import BoardState, UNDO_LIMIT
+from app.helpers import ACTION_LIST
+from app.simulator import create_board
+
+
+def get_state(board: BoardState) -> tuple:
+    return (bytes(board.walls), bytes(board.territory), board.craftsman_positions.tolist(), board.occupancy.tolist(),
+            board.turn, board.hash, board.calculate_point())
+
+
+def play_turn(board: BoardState, rng: random.Random, turn: int):
+    board.resolve_turn(actions={craftsman: ACTION_LIST[rng.randrange(len(ACTION_LIST))]
+                                for craftsman in range(len(board.craftsman_ids))}, turn=turn)
+    board.update_territory()
+
+
+def test_fork_does_not_change_parent(make_random_field):
+    rng = random.Random(0)
+    board = create_board(field=make_random_field(rng=rng, width=6, height=6, craftsman_count=3))
+    for turn in range(1, 20):
+        play_turn(board=board, rng=rng, turn=turn)
+    state = get_state(board=board)
+    forks = [board.fork() for _ in range(3)]
+    for fork in forks:
+        for turn in range(20, 40):
+            play_turn(board=fork, rng=rng, turn=turn)
+    assert get_state(board=board) == state
+    fork_states = [get_state(board=fork) for fork in forks]
+    for turn in range(20, 40):
+        play_turn(board=board, rng=rng, turn=turn)
+    assert [get_state(board=fork) for fork in forks] == fork_states
+    for fork in forks:
+        assert fork.hash == fork.compute_hash()
+
+
+def test_fork_matches_copy(make_random_field):
+    rng = random.Random(1)
+    board = create_board(field=make_random_field(rng=rng, width=6, height=6, craftsman_count=3))
+    for turn in range(1, 10):
+        play_turn(board=board, rng=rng, turn=turn)
+    (fork, copy) = (board.fork(), board.copy())
+    for turn in range(10, 40):
+        actions_seed = rng.random()
+        play_turn(board=fork, rng=random.Random(actions_seed), turn=turn)
+        play_turn(board=copy, rng=random.Random(actions_seed), turn=turn)
+        assert get_state(board=fork) == get_state(board=copy)
+
+
+def test_undo_restores_every_turn(make_random_field):
+    rng = random.Random(2)
+    board = create_board(field=make_random_field(rng=rng, width=7, height=5, craftsman_count=3))
+    states = [get_state(board=board)]
+    for turn in range(1, 40):
+        play_turn(board=board, rng=rng, turn=turn)
+        states.append(get_state(board=board))
+    while len(states) > 1:
+        states.pop()
+        assert board.undo()
+        assert get_state(board=board) == states[-1]
+    assert not board.undo()
+    play_turn(board=board, rng=random.Random(3), turn=1)
+    assert board.hash == board.compute_hash()
+
+
+def test_undo_of_fork_keeps_parent(make_random_field):
+    rng = random.Random(4)
+    board = create_board(field=make_random_field(rng=rng, width=6, height=6, craftsman_count=2))
+    play_turn(board=board, rng=rng, turn=1)
+    state = get_state(board=board)
+    fork = board.fork()
+    assert not fork.undo()
+    play_turn(board=fork, rng=rng, turn=2)
+    assert fork.undo()
+    assert get_state(board=fork) == state == get_state(board=board)
+
+
+def test_undo_is_limited(make_field):
+    board = create_board(field=make_field(width=4, height=4, craftsmen=[("a", "A", 1, 1)]))
+    for turn in range(1, UNDO_LIMIT + 10):
+        board.resolve_turn(actions={}, turn=turn)
+    assert sum(board.undo() for _ in range(UNDO_LIMIT + 10)) == UNDO_LIMIT
+    assert board.turn == 9
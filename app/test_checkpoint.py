@@ -0,0 +1,104 @@
+import os
+import random
+
+import app.checkpoint
+from app.board_state import BoardState
+from app.checkpoint import CheckpointStore
+from app.helpers import ActionType, ACTION_LIST
+from app.models import GameActionsResp
+from app.simulator import replay
+
+
+def create_history(rng: random.Random, craftsman_ids: list[str], last_turn: int) -> list[GameActionsResp]:
+    list_actions = []
+    for turn in range(1, last_turn + 1):
+        for _ in range(rng.choice([1, 1, 2])):
+            actions = []
+            for craftsman_id in craftsman_ids:
+                (action, action_param) = ACTION_LIST[rng.randrange(len(ACTION_LIST))]
+                if action != ActionType.STAY:
+                    actions.append(GameActionsResp.ChildAction(craftsman_id=craftsman_id, action=action,
+                                                               action_param=action_param))
+            list_actions.append(GameActionsResp(turn=turn, actions=actions))
+    return list_actions
+
+
+def get_state(board: BoardState) -> tuple:
+    return bytes(board.walls), bytes(board.territory), board.craftsman_positions.tolist(), board.turn, board.hash
+
+
+def count_applied_turns(monkeypatch) -> list:
+    applied = []
+    apply_turn = app.checkpoint.apply_turn
+
+    def counting_apply_turn(board, actions):
+        applied.append(actions.turn)
+        return apply_turn(board=board, actions=actions)
+    monkeypatch.setattr(app.checkpoint, "apply_turn", counting_apply_turn)
+    return applied
+
+
+def test_rebuild_matches_replay(make_random_field, tmp_path):
+    rng = random.Random(0)
+    field = make_random_field(rng=rng, width=6, height=6, craftsman_count=2)
+    list_actions = create_history(rng=rng, craftsman_ids=["0", "1", "2", "3"], last_turn=35)
+    store = CheckpointStore(game_id="1", interval=10, directory=str(tmp_path))
+    for turn in (5, 35, 20, 35):
+        board = store.rebuild(field=field, list_actions=list_actions, turn=turn)
+        assert get_state(board=board) == get_state(board=replay(field=field, list_actions=list_actions, turn=turn))
+    assert sorted(os.listdir(tmp_path / "1")) == ["turn_10.pkl", "turn_20.pkl", "turn_30.pkl"]
+
+
+def test_rebuild_starts_from_saved_checkpoint(make_random_field, tmp_path, monkeypatch):
+    rng = random.Random(1)
+    field = make_random_field(rng=rng, width=6, height=6, craftsman_count=2)
+    list_actions = create_history(rng=rng, craftsman_ids=["0", "1", "2", "3"], last_turn=25)
+    CheckpointStore(game_id="1", interval=10, directory=str(tmp_path)) \
+        .rebuild(field=field, list_actions=list_actions, turn=25)
+    applied = count_applied_turns(monkeypatch=monkeypatch)
+    board = CheckpointStore(game_id="1", interval=10, directory=str(tmp_path)) \
+        .rebuild(field=field, list_actions=list_actions, turn=25)
+    assert applied == [21, 22, 23, 24, 25]
+    assert get_state(board=board) == get_state(board=replay(field=field, list_actions=list_actions, turn=25))
+
+
+def test_changed_history_falls_back_to_earlier_checkpoint(make_random_field, tmp_path, monkeypatch):
+    rng = random.Random(2)
+    field = make_random_field(rng=rng, width=6, height=6, craftsman_count=2)
+    list_actions = create_history(rng=rng, craftsman_ids=["0", "1", "2", "3"], last_turn=25)
+    store = CheckpointStore(game_id="1", interval=10, directory=str(tmp_path))
+    store.rebuild(field=field, list_actions=list_actions, turn=25)
+    changed_actions = list_actions + create_history(rng=rng, craftsman_ids=["0", "1", "2", "3"], last_turn=15)[-1:]
+    applied = count_applied_turns(monkeypatch=monkeypatch)
+    board = store.rebuild(field=field, list_actions=changed_actions, turn=25)
+    assert applied[0] == 11
+    assert get_state(board=board) == get_state(board=replay(field=field, list_actions=changed_actions, turn=25))
+
+
+def test_digests_are_chained(make_random_field):
+    rng = random.Random(3)
+    field = make_random_field(rng=rng, width=5, height=5, craftsman_count=1)
+    turn_actions = create_history(rng=rng, craftsman_ids=["0", "1"], last_turn=10)
+    digests = CheckpointStore.get_digests(field=field, turn_actions=turn_actions)
+    assert CheckpointStore.get_digests(field=field, turn_actions=turn_actions[:4]) == digests[:4]
+    assert CheckpointStore.get_digests(field=field, turn_actions=turn_actions[:3] + turn_actions[4:5])[3] != digests[3]
+
+
+def test_board_of_another_field_is_not_saved(make_random_field, tmp_path):
+    rng = random.Random(4)
+    field = make_random_field(rng=rng, width=8, height=8, craftsman_count=2)
+    list_actions = create_history(rng=rng, craftsman_ids=["0", "1", "2", "3"], last_turn=10)
+    store = CheckpointStore(game_id="1", interval=10, directory=str(tmp_path))
+    placeholder = BoardState(width=25, height=25)
+    placeholder.turn = 10
+    other = replay(field=make_random_field(rng=rng, width=8, height=8, craftsman_count=2),
+                   list_actions=list_actions, turn=10)
+    for board in (placeholder, other):
+        store.save_if_due(board=board, field=field, list_actions=list_actions)
+    assert not (tmp_path / "1").exists()
+    store.save_if_due(board=replay(field=field, list_actions=list_actions, turn=10), field=field,
+                      list_actions=list_actions)
+    assert os.listdir(tmp_path / "1") == ["turn_10.pkl"]
+    board = CheckpointStore(game_id="1", interval=10, directory=str(tmp_path)) \
+        .rebuild(field=field, list_actions=list_actions, turn=10)
+    assert get_state(board=board) == get_state(board=replay(field=field, list_actions=list_actions, turn=10))
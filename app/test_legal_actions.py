@@ -0,0 +1,43 @@
+import random
+
+from app.helpers import ActionType, BuildAndDestroyType, MoveType, Side, ACTION_LIST
+from app.legal_actions import ACTION_INDEX, find_illegal_actions, get_legal_action_indexes, get_legal_action_mask
+from app.models import GameActionsReq
+from app.simulator import create_board
+
+
+def test_corner_craftsman_can_only_stay_or_move_to_castle(make_field):
+    board = create_board(field=make_field(width=4, height=4, craftsmen=[("a", "A", 0, 0), ("b", "B", 1, 1)],
+                                          ponds=[(1, 0)], castles=[(0, 1)]))
+    assert get_legal_action_indexes(board=board, craftsman=0) == [0, ACTION_INDEX[(ActionType.MOVE, MoveType.DOWN)]]
+
+
+def test_mask_matches_single_action_result(make_random_field):
+    rng = random.Random(0)
+    board = create_board(field=make_random_field(rng=rng, width=6, height=5, craftsman_count=3))
+    for turn in range(1, 30):
+        for craftsman in range(len(board.craftsman_ids)):
+            mask = get_legal_action_mask(board=board, craftsman=craftsman)
+            for index, action in enumerate(ACTION_LIST[1:], start=1):
+                state = board.fork()
+                state.resolve_turn(actions={craftsman: action}, turn=turn)
+                is_changed = state.walls != board.walls or state.craftsman_positions != board.craftsman_positions
+                assert is_changed == mask[index]
+        board.resolve_turn(actions={craftsman: ACTION_LIST[rng.randrange(len(ACTION_LIST))]
+                                    for craftsman in range(len(board.craftsman_ids))}, turn=turn)
+        board.update_territory()
+
+
+def test_find_illegal_actions(make_field):
+    board = create_board(field=make_field(width=4, height=4, craftsmen=[("a", "A", 1, 1), ("b", "B", 2, 2)]))
+    legal_actions = [GameActionsReq.ChildAction(craftsman_id="a", action=ActionType.BUILD,
+                                                action_param=BuildAndDestroyType.LEFT),
+                     GameActionsReq.ChildAction(craftsman_id="a", action=ActionType.STAY,
+                                                action_param=MoveType.UP)]
+    illegal_actions = [GameActionsReq.ChildAction(craftsman_id="b", action=ActionType.MOVE, action_param=MoveType.UP),
+                       GameActionsReq.ChildAction(craftsman_id="c", action=ActionType.STAY),
+                       GameActionsReq.ChildAction(craftsman_id="a", action=ActionType.DESTROY,
+                                                  action_param=BuildAndDestroyType.LEFT),
+                       GameActionsReq.ChildAction(craftsman_id="a", action=ActionType.MOVE,
+                                                  action_param=MoveType.LOWER_RIGHT)]
+    assert find_illegal_actions(board=board, side=Side.A, actions=legal_actions + illegal_actions) == illegal_actions
@@ -0,0 +1,116 @@
+import threading
+import time
+
+from app.network_worker import NetworkWorker
+
+TIMEOUT = 5
+
+
+class StubWidget:
+    """Keep the ``after`` jobs until ``run_jobs`` is called, like a Tk mainloop driven by hand."""
+
+    def __init__(self):
+        self.jobs = {}
+        self._next_job = 0
+
+    def after(self, interval: int, function):
+        self._next_job += 1
+        job = f"after#{self._next_job}"
+        self.jobs[job] = function
+        return job
+
+    def after_cancel(self, job: str):
+        self.jobs.pop(job, None)
+
+    def run_jobs(self):
+        (jobs, self.jobs) = (self.jobs, {})
+        for function in jobs.values():
+            function()
+
+
+def run_until(widget: StubWidget, condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        widget.run_jobs()
+        time.sleep(0.001)
+
+
+def wait_for_lane(worker: NetworkWorker, widget: StubWidget, lane: str):
+    """Wait until the requests submitted to ``lane`` so far have run and their results are delivered."""
+    results = []
+    worker.submit(key=f"barrier:{lane}", function=lambda: None, callback=results.append, lane=lane)
+    run_until(widget=widget, condition=lambda: results)
+
+
+def test_key_in_flight_is_not_submitted_again():
+    widget = StubWidget()
+    worker = NetworkWorker(widget=widget)
+    release = threading.Event()
+    results = []
+    assert worker.submit(key="status", function=lambda: release.wait(TIMEOUT) and 1, callback=results.append)
+    assert not worker.submit(key="status", function=lambda: 2, callback=results.append)
+    assert worker.is_in_flight(key="status")
+    release.set()
+    run_until(widget=widget, condition=lambda: results)
+    assert results == [1]
+    assert not worker.is_in_flight(key="status")
+    assert worker.submit(key="status", function=lambda: 3, callback=results.append)
+    run_until(widget=widget, condition=lambda: len(results) == 2)
+    assert results == [1, 3]
+    worker.stop()
+
+
+def test_cancelled_result_never_reaches_callback():
+    widget = StubWidget()
+    worker = NetworkWorker(widget=widget)
+    release = threading.Event()
+    (stale, fresh) = ([], [])
+    worker.submit(key="snapshot", function=lambda: release.wait(TIMEOUT) and "stale", callback=stale.append)
+    worker.cancel(key="snapshot")
+    worker.submit(key="snapshot", function=lambda: "fresh", callback=fresh.append)
+    release.set()
+    wait_for_lane(worker=worker, widget=widget, lane="default")
+    assert (stale, fresh) == ([], ["fresh"])
+    worker.stop()
+
+
+def test_cancelled_request_does_not_run():
+    widget = StubWidget()
+    worker = NetworkWorker(widget=widget)
+    release = threading.Event()
+    (sent, results) = ([], [])
+    worker.submit(key="status", function=lambda: release.wait(TIMEOUT), callback=results.append)
+    worker.submit(key="actions", function=lambda: sent.append(1), callback=results.append)
+    worker.cancel(key="actions")
+    release.set()
+    wait_for_lane(worker=worker, widget=widget, lane="default")
+    assert (sent, results) == ([], [True])
+    worker.stop()
+
+
+def test_lane_does_not_wait_behind_another_lane():
+    widget = StubWidget()
+    worker = NetworkWorker(widget=widget)
+    release = threading.Event()
+    results = []
+    worker.submit(key="snapshot", function=lambda: release.wait(TIMEOUT), callback=results.append)
+    worker.submit(key="actions", function=lambda: 200, callback=results.append, lane="actions")
+    run_until(widget=widget, condition=lambda: results)
+    assert results == [200]
+    assert worker.is_in_flight(key="snapshot")
+    release.set()
+    run_until(widget=widget, condition=lambda: len(results) == 2)
+    worker.stop()
+
+
+def test_error_goes_to_error_callback():
+    widget = StubWidget()
+    worker = NetworkWorker(widget=widget)
+    (results, errors) = ([], [])
+    worker.submit(key="status", function=lambda: 1 / 0, callback=results.append, error_callback=errors.append)
+    run_until(widget=widget, condition=lambda: errors)
+    assert results == []
+    assert isinstance(errors[0], ZeroDivisionError)
+    worker.stop()
+    assert widget.jobs == {}
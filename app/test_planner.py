@@ -0,0 +1,40 @@
+import time
+
+from app.helpers import ActionType, Owner, Side
+from app.legal_actions import find_illegal_actions, get_legal_action_mask
+from app.planner import Planner, search
+from app.simulator import create_board
+
+
+def create_boxed_board(make_field):
+    """Craftsman "a0" is boxed in by ponds in a corner, so staying is its only legal action."""
+    return create_board(field=make_field(width=5, height=5,
+                                         craftsmen=[("a0", "A", 0, 0), ("b0", "B", 4, 4), ("a1", "A", 2, 2)],
+                                         ponds=[(1, 0), (0, 1), (1, 1)], castles=[(3, 3)]))
+
+
+def test_search_visits_only_legal_actions(make_field):
+    board = create_boxed_board(make_field=make_field)
+    (craftsmen, action_visits, action_values) = search(board=board, owner=Owner.A, duration=0.2, seed=0)
+    assert craftsmen == [0, 2]
+    for craftsman, visits, values in zip(craftsmen, action_visits, action_values):
+        mask = get_legal_action_mask(board=board, craftsman=craftsman)
+        assert sum(visits) > 0
+        assert all(is_legal or (visit == 0 and value == 0) for is_legal, visit, value in zip(mask, visits, values))
+
+
+def test_best_actions_cover_every_craftsman_of_side(make_field):
+    board = create_boxed_board(make_field=make_field)
+    planner = Planner(processes=1)
+    try:
+        planner.start(board=board.copy(), side=Side.A, deadline=time.monotonic() + 0.3)
+        deadline = time.monotonic() + 5
+        while not planner.poll():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        actions = planner.get_best_actions()
+    finally:
+        planner.shutdown()
+    assert [action.craftsman_id for action in actions] == ["a0", "a1"]
+    assert (actions[0].action, actions[0].action_param) == (ActionType.STAY, None)
+    assert find_illegal_actions(board=board, side=Side.A, actions=actions) == []
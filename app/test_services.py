@@ -0,0 +1,61 @@
+import requests
+
+from app.services import Service
+
+GAME = {"id": 1, "time_per_turn": 10, "field": {"width": 3, "height": 3, "ponds": "[]", "castles": "[]",
+                                                "craftsmen": '[{"x": 1, "y": 1, "side": "A", "id": "a"}]'}}
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, data=None, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    """Answer the requests with ``responses`` in order and keep the arguments of every request."""
+
+    def __init__(self, responses: list[FakeResponse]):
+        self.headers = {}
+        self.requests = []
+        self._responses = list(responses)
+
+    def get(self, url: str, headers: dict = None, params: dict = None, timeout=None) -> FakeResponse:
+        self.requests.append((url, headers or {}, params or {}))
+        return self._responses.pop(0)
+
+
+def test_not_modified_game_is_reused():
+    validators = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Nov 2023 00:00:00 GMT"}
+    session = FakeSession(responses=[FakeResponse(status_code=requests.codes.ok, data=GAME, headers=validators),
+                                     FakeResponse(status_code=requests.codes.not_modified)])
+    service = Service(session=session)
+    game = service.get_game_with_game_id()
+    assert game.field.craftsmen[0].id == "a"
+    assert service.get_game_with_game_id() is game
+    assert session.requests[0][1] == {}
+    assert session.requests[1][1] == {"If-None-Match": '"v1"', "If-Modified-Since": validators["Last-Modified"]}
+
+
+def test_game_without_validators_is_not_cached():
+    session = FakeSession(responses=[FakeResponse(status_code=requests.codes.ok, data=GAME),
+                                     FakeResponse(status_code=requests.codes.ok, data=GAME)])
+    service = Service(session=session)
+    game = service.get_game_with_game_id()
+    assert service.get_game_with_game_id() is not game
+    assert [headers for (_, headers, _) in session.requests] == [{}, {}]
+
+
+def test_known_actions_are_skipped():
+    actions = [{"id": i, "turn": i, "actions": []} for i in range(1, 5)]
+    session = FakeSession(responses=[FakeResponse(status_code=requests.codes.ok, data=actions),
+                                     FakeResponse(status_code=requests.codes.ok, data={"detail": "Not found"})])
+    service = Service(session=session)
+    assert [resp.id for resp in service.get_game_actions_with_game_id(since_turn=2, known_ids={1, 3})] == [2, 4]
+    assert session.requests[0][2] == {"since_turn": 2}
+    assert service.get_game_actions_with_game_id() == []
+    assert session.requests[1][2] == {}
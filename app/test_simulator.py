@@ -0,0 +1,99 @@
+import random
+
+from app.helpers import ActionType, BuildAndDestroyType, MoveType, Owner
+from app.models import GameActionsResp
+from app.simulator import apply_turn, create_board, next_state
+
+
+def create_actions(turn: int, *actions: tuple) -> GameActionsResp:
+    return GameActionsResp(turn=turn, actions=[
+        GameActionsResp.ChildAction(craftsman_id=craftsman_id, action=action, action_param=action_param)
+        for (craftsman_id, action, action_param) in actions])
+
+
+def test_moves_into_same_square_are_cancelled(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1), ("b", "B", 3, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("a", ActionType.MOVE, MoveType.RIGHT),
+                                                   ("b", ActionType.MOVE, MoveType.LEFT)))
+    assert board.position(index=board.craftsman_positions[board.find_craftsman(craftsman_id="a")]) == (1, 1)
+    assert board.position(index=board.craftsman_positions[board.find_craftsman(craftsman_id="b")]) == (3, 1)
+
+
+def test_move_into_square_left_in_same_turn_is_blocked(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1), ("c", "A", 2, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("a", ActionType.MOVE, MoveType.RIGHT),
+                                                   ("c", ActionType.MOVE, MoveType.RIGHT)))
+    assert board.craftsman_positions.tolist() == [board.index(x=1, y=1), board.index(x=3, y=1)]
+
+
+def test_builds_of_both_sides_on_same_square_are_cancelled(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1), ("b", "B", 3, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("a", ActionType.BUILD, BuildAndDestroyType.RIGHT),
+                                                   ("b", ActionType.BUILD, BuildAndDestroyType.LEFT)))
+    assert board.walls[board.index(x=2, y=1)] == Owner.NONE
+
+
+def test_builds_of_one_side_on_same_square_build_one_wall(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1), ("c", "A", 3, 1)]))
+    changed = board.apply_turn(actions=create_actions(1, ("a", ActionType.BUILD, BuildAndDestroyType.RIGHT),
+                                                      ("c", ActionType.BUILD, BuildAndDestroyType.LEFT)).actions,
+                               turn=1)
+    assert changed == [board.index(x=2, y=1)]
+    assert board.walls[board.index(x=2, y=1)] == Owner.A
+
+
+def test_destroy_is_applied_before_build(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1), ("b", "B", 3, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("a", ActionType.BUILD, BuildAndDestroyType.RIGHT)))
+    apply_turn(board=board, actions=create_actions(2, ("a", ActionType.DESTROY, BuildAndDestroyType.RIGHT),
+                                                   ("b", ActionType.BUILD, BuildAndDestroyType.LEFT)))
+    assert board.walls[board.index(x=2, y=1)] == Owner.B
+
+
+def test_build_is_applied_before_move(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1), ("b", "B", 3, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("a", ActionType.MOVE, MoveType.RIGHT),
+                                                   ("b", ActionType.BUILD, BuildAndDestroyType.LEFT)))
+    assert board.walls[board.index(x=2, y=1)] == Owner.B
+    assert board.craftsman_positions[0] == board.index(x=1, y=1)
+
+
+def test_move_is_blocked_by_pond_and_other_side_wall(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 2, 1), ("b", "B", 4, 1)],
+                                          ponds=[(1, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("b", ActionType.BUILD, BuildAndDestroyType.LEFT)))
+    apply_turn(board=board, actions=create_actions(2, ("a", ActionType.MOVE, MoveType.LEFT)))
+    apply_turn(board=board, actions=create_actions(3, ("a", ActionType.MOVE, MoveType.RIGHT)))
+    assert board.craftsman_positions[0] == board.index(x=2, y=1)
+
+
+def test_only_last_action_of_craftsman_is_used(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1)]))
+    apply_turn(board=board, actions=create_actions(1, ("a", ActionType.BUILD, BuildAndDestroyType.RIGHT),
+                                                   ("a", ActionType.MOVE, MoveType.DOWN)))
+    assert board.walls[board.index(x=2, y=1)] == Owner.NONE
+    assert board.craftsman_positions[0] == board.index(x=1, y=2)
+
+
+def test_result_does_not_depend_on_action_order(make_field):
+    rng = random.Random(0)
+    field = make_field(width=4, height=4, craftsmen=[(str(i), "AB"[i % 2], i % 4, i // 4 * 2) for i in range(8)])
+    for _ in range(50):
+        actions = [(str(i), ActionType.MOVE, rng.choice(list(MoveType))) if rng.random() < 0.5
+                   else (str(i), ActionType.BUILD, rng.choice(list(BuildAndDestroyType))) for i in range(8)]
+        expected = None
+        for _ in range(10):
+            rng.shuffle(actions)
+            board = create_board(field=field)
+            apply_turn(board=board, actions=create_actions(1, *actions))
+            state = (bytes(board.walls), board.craftsman_positions.tolist())
+            assert expected is None or state == expected
+            expected = state
+
+
+def test_next_state_leaves_board_unchanged(make_field):
+    board = create_board(field=make_field(width=5, height=3, craftsmen=[("a", "A", 1, 1)]))
+    state = next_state(board=board, actions=create_actions(1, ("a", ActionType.BUILD, BuildAndDestroyType.RIGHT)))
+    assert board.walls[board.index(x=2, y=1)] == Owner.NONE
+    assert state.walls[board.index(x=2, y=1)] == Owner.A
+    assert (board.turn, state.turn) == (0, 1)
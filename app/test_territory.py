@@ -0,0 +1,57 @@
+import random
+
+from app.territory import Territory
+
+
+def create_walls(width: int, height: int, squares: list[tuple]) -> bytearray:
+    walls = bytearray(width * height)
+    for (x, y) in squares:
+        walls[x * height + y] = 1
+    return walls
+
+
+def ring(x1: int, y1: int, x2: int, y2: int) -> list[tuple]:
+    return [(x, y) for x in range(x1, x2 + 1) for y in range(y1, y2 + 1) if x in (x1, x2) or y in (y1, y2)]
+
+
+def test_ring_encloses_inside():
+    territory = Territory(width=6, height=5)
+    territory.update(walls=create_walls(width=6, height=5, squares=ring(x1=1, y1=1, x2=4, y2=3)))
+    assert territory.is_close(x=2, y=2)
+    assert territory.is_close(x=3, y=2)
+    assert not territory.is_close(x=1, y=1)
+    assert not territory.is_close(x=0, y=0)
+    assert not territory.is_close(x=5, y=4)
+
+
+def test_gap_in_ring_leaves_inside_open():
+    squares = ring(x1=1, y1=1, x2=4, y2=3)
+    squares.remove((4, 2))
+    territory = Territory(width=6, height=5)
+    territory.update(walls=create_walls(width=6, height=5, squares=squares))
+    assert not territory.is_close(x=2, y=2)
+
+
+def test_ring_on_border_encloses_inside():
+    territory = Territory(width=3, height=3)
+    territory.update(walls=create_walls(width=3, height=3, squares=ring(x1=0, y1=0, x2=2, y2=2)))
+    assert territory.is_close(x=1, y=1)
+
+
+def test_set_wall_matches_full_update():
+    rng = random.Random(0)
+    (width, height) = (9, 7)
+    territory = Territory(width=width, height=height)
+    walls = bytearray(width * height)
+    territory.update(walls=walls)
+    for _ in range(500):
+        (x, y) = (rng.randrange(width), rng.randrange(height))
+        is_wall = rng.random() < 0.6
+        walls[x * height + y] = is_wall
+        before = [territory.is_close(x=i, y=j) for i in range(width) for j in range(height)]
+        changed = territory.set_wall(x=x, y=y, is_wall=is_wall)
+        expected = Territory(width=width, height=height)
+        expected.update(walls=walls)
+        after = [expected.is_close(x=i, y=j) for i in range(width) for j in range(height)]
+        assert after == [territory.is_close(x=i, y=j) for i in range(width) for j in range(height)]
+        assert {i for i in range(width * height) if before[i] != after[i]} <= set(changed)
@@ -0,0 +1,64 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from app.turn_clock import TurnClock, MAX_POLL_INTERVAL, MIN_POLL_INTERVAL, POLL_LEAD, RESYNC_INTERVAL, \
+    RTT_SMOOTHING, START_TIME_TOLERANCE
+
+
+def create_clock() -> TurnClock:
+    """Clock of a server whose turn 1 ends at 100 with 10 seconds per turn, seen through three statuses."""
+    clock = TurnClock()
+    clock.sync_game(time_per_turn=10, start_time=None)
+    clock.add_status(turn=1, remaining=10, sent_at=90.0, received_at=90.2)
+    clock.add_status(turn=1, remaining=0, sent_at=99.8, received_at=99.9)
+    clock.add_status(turn=2, remaining=10, sent_at=100.1, received_at=100.2)
+    return clock
+
+
+def test_statuses_narrow_deadline():
+    clock = create_clock()
+    (lower, upper) = clock.get_deadline_bounds(turn=1)
+    assert 99.8 <= lower <= 100 <= upper <= 100.2
+    (lower, upper) = clock.get_deadline_bounds(turn=3)
+    assert 119.8 <= lower <= 120 <= upper <= 120.2
+
+
+def test_rtt_is_smoothed():
+    clock = TurnClock()
+    clock.add_status(turn=1, remaining=None, sent_at=0.0, received_at=0.2)
+    clock.add_status(turn=1, remaining=None, sent_at=1.0, received_at=1.1)
+    assert clock.rtt == pytest.approx(0.2 + RTT_SMOOTHING * (0.1 - 0.2))
+    clock.add_status(turn=None, remaining=None, sent_at=2.0, received_at=5.0)
+    assert clock.rtt == pytest.approx(0.2 + RTT_SMOOTHING * (0.1 - 0.2))
+
+
+def test_conflicting_status_starts_again():
+    clock = create_clock()
+    clock.add_status(turn=2, remaining=3, sent_at=100.3, received_at=100.4)
+    assert clock.get_deadline_bounds(turn=2) == (102.3, 104.4)
+
+
+def test_release_time_is_before_deadline_of_previous_turn():
+    clock = create_clock()
+    (lower, _) = clock.get_deadline_bounds(turn=2)
+    assert clock.get_release_time(turn=3, safety_margin=0.5) == pytest.approx(lower - 0.5 - clock.rtt)
+    assert TurnClock().get_release_time(turn=3, safety_margin=0.5) is None
+
+
+def test_poll_time_around_deadline():
+    clock = create_clock()
+    (lower, upper) = clock.get_deadline_bounds(turn=2)
+    assert clock.get_poll_time(turn=2, last_poll=100.2, now=100.2) == 100.2 + RESYNC_INTERVAL
+    assert clock.get_poll_time(turn=2, last_poll=107, now=107) == lower - POLL_LEAD
+    assert clock.get_poll_time(turn=2, last_poll=lower, now=lower) == pytest.approx(lower + MIN_POLL_INTERVAL)
+    assert clock.get_poll_time(turn=2, last_poll=upper + 5, now=upper + 5) == upper + 5 + MAX_POLL_INTERVAL
+    assert TurnClock().get_poll_time(turn=2, last_poll=3, now=3) == 3 + MAX_POLL_INTERVAL
+
+
+def test_start_time_gives_first_guess():
+    clock = TurnClock()
+    clock.sync_game(time_per_turn=10, start_time=datetime.now())
+    remaining = clock.get_remaining(turn=2, now=time.monotonic())
+    assert 20 - START_TIME_TOLERANCE <= remaining <= 20 + START_TIME_TOLERANCE
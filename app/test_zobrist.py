@@ -0,0 +1,52 @@
+import random
+
+from app.helpers import ActionType, BuildAndDestroyType, MoveType, ACTION_LIST
+from app.simulator import create_board
+from app.zobrist import TranspositionTable
+
+
+def test_hash_follows_every_change(make_random_field):
+    rng = random.Random(0)
+    board = create_board(field=make_random_field(rng=rng, width=7, height=6, craftsman_count=3))
+    assert board.hash == board.compute_hash()
+    for turn in range(1, 80):
+        board.resolve_turn(actions={craftsman: ACTION_LIST[rng.randrange(len(ACTION_LIST))]
+                                    for craftsman in range(len(board.craftsman_ids))}, turn=turn)
+        assert board.hash == board.compute_hash()
+        board.update_territory()
+        assert board.hash == board.compute_hash()
+
+
+def test_transposed_turns_have_same_hash(make_field):
+    field = make_field(width=4, height=4, craftsmen=[("a", "A", 1, 1), ("b", "B", 3, 3)])
+    (board, other) = (create_board(field=field), create_board(field=field))
+    board.resolve_turn(actions={0: (ActionType.MOVE, MoveType.RIGHT), 1: (ActionType.BUILD, BuildAndDestroyType.LEFT)},
+                       turn=1)
+    board.resolve_turn(actions={0: (ActionType.MOVE, MoveType.DOWN)}, turn=2)
+    other.resolve_turn(actions={0: (ActionType.MOVE, MoveType.DOWN)}, turn=1)
+    other.resolve_turn(actions={0: (ActionType.MOVE, MoveType.RIGHT), 1: (ActionType.BUILD, BuildAndDestroyType.LEFT)},
+                       turn=2)
+    assert board.hash == other.hash
+    other.resolve_turn(actions={}, turn=3)
+    assert board.hash != other.hash
+
+
+def test_wall_side_changes_hash(make_field):
+    field = make_field(width=4, height=4, craftsmen=[("a", "A", 1, 1), ("b", "B", 3, 1)])
+    (board, other) = (create_board(field=field), create_board(field=field))
+    board.resolve_turn(actions={0: (ActionType.BUILD, BuildAndDestroyType.RIGHT)}, turn=1)
+    other.resolve_turn(actions={1: (ActionType.BUILD, BuildAndDestroyType.LEFT)}, turn=1)
+    assert board.walls == other.walls.translate(bytes.maketrans(b"\x02", b"\x01"))
+    assert board.hash != other.hash
+
+
+def test_transposition_table_evicts_least_recently_used():
+    table = TranspositionTable(max_size=2)
+    table.put(key=1, value="one")
+    table.put(key=2, value="two")
+    assert table.get(key=1) == "one"
+    table.put(key=3, value="three")
+    assert len(table) == 2
+    assert 2 not in table
+    assert table.get(key=2, default="missing") == "missing"
+    assert (table.get(key=1), table.get(key=3)) == ("one", "three")
@@ -0,0 +1,112 @@
+import time
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+REMAINING_RESOLUTION = 1.0
+START_TIME_TOLERANCE = 2.0
+RTT_SMOOTHING = 0.25
+MIN_POLL_INTERVAL = 0.1
+MAX_POLL_INTERVAL = 0.5
+POLL_BACKOFF = 0.5
+POLL_LEAD = 0.2
+RESYNC_INTERVAL = 5.0
+
+
+def call_timed(function: Callable[[], Any]) -> (Any, float, float):
+    """Return the result of ``function`` with the ``time.monotonic()`` values before and after the call."""
+    sent_at = time.monotonic()
+    result = function()
+    return result, sent_at, time.monotonic()
+
+
+class TurnClock:
+    """Prediction of the turn deadlines of the server in ``time.monotonic()`` time.
+
+    The deadline of one reference turn is kept as an interval, the others are ``time_per_turn`` apart. Every
+    status narrows the interval: the server read its clock between sending and receiving the request, and
+    ``remaining`` is whole seconds, rounded either way. A turn seen changing between two polls bounds its
+    deadline by the two requests, which is usually much tighter. Before any status, ``start_time`` gives a wide
+    first guess.
+    """
+
+    def __init__(self):
+        self.time_per_turn: Optional[float] = None
+        self.rtt: Optional[float] = None
+        self._turn: Optional[int] = None
+        self._lower: float = 0
+        self._upper: float = 0
+        self._last_status: Optional[tuple] = None
+
+    def sync_game(self, time_per_turn: Optional[int], start_time: Optional[datetime]):
+        self.time_per_turn = time_per_turn
+        if self._turn is None and time_per_turn and start_time is not None:
+            # The first turn ends ``time_per_turn`` after the start, the clocks are only assumed to be close.
+            deadline = start_time.timestamp() + time_per_turn - time.time() + time.monotonic()
+            self.set_bounds(turn=1, lower=deadline - START_TIME_TOLERANCE, upper=deadline + START_TIME_TOLERANCE)
+
+    def add_status(self, turn: Optional[int], remaining: Optional[int], sent_at: float, received_at: float):
+        """Add a status whose request was sent and received at these ``time.monotonic()`` values."""
+        if turn is None:
+            return
+        rtt = received_at - sent_at
+        self.rtt = rtt if self.rtt is None else self.rtt + RTT_SMOOTHING * (rtt - self.rtt)
+        if remaining is not None:
+            self.narrow(turn=turn, lower=sent_at + remaining - REMAINING_RESOLUTION,
+                        upper=received_at + remaining + REMAINING_RESOLUTION)
+        if self._last_status is not None:
+            (last_turn, last_sent_at) = self._last_status
+            if turn == last_turn + 1 and last_sent_at < sent_at:
+                self.narrow(turn=last_turn, lower=last_sent_at, upper=received_at)
+        if self._last_status is None or turn >= self._last_status[0]:
+            self._last_status = (turn, sent_at)
+
+    def narrow(self, turn: int, lower: float, upper: float):
+        """Intersect the deadline of ``turn`` with [``lower``, ``upper``], start again from it if they conflict."""
+        bounds = self.get_deadline_bounds(turn=turn)
+        if bounds is not None and max(bounds[0], lower) <= min(bounds[1], upper):
+            (lower, upper) = (max(bounds[0], lower), min(bounds[1], upper))
+        self.set_bounds(turn=turn, lower=lower, upper=upper)
+
+    def set_bounds(self, turn: int, lower: float, upper: float):
+        (self._turn, self._lower, self._upper) = (turn, lower, upper)
+
+    def get_deadline_bounds(self, turn: int) -> Optional[tuple]:
+        if self._turn is None:
+            return None
+        if turn == self._turn:
+            return self._lower, self._upper
+        if not self.time_per_turn:
+            return None
+        shift = (turn - self._turn) * self.time_per_turn
+        return self._lower + shift, self._upper + shift
+
+    def get_remaining(self, turn: int, now: float) -> Optional[float]:
+        bounds = self.get_deadline_bounds(turn=turn)
+        if bounds is None:
+            return None
+        return max(0.0, (bounds[0] + bounds[1]) / 2 - now)
+
+    def get_release_time(self, turn: int, safety_margin: float) -> Optional[float]:
+        """Return the latest time to send the actions for ``turn``.
+
+        They have to arrive ``safety_margin`` before the earliest deadline of the turn before it.
+        """
+        bounds = self.get_deadline_bounds(turn=turn - 1)
+        if bounds is None:
+            return None
+        return bounds[0] - safety_margin - (self.rtt or 0)
+
+    def get_poll_time(self, turn: int, last_poll: float, now: float) -> float:
+        """Return when to ask the status next while ``turn`` is the current turn.
+
+        Far from the deadline the status is only asked every ``RESYNC_INTERVAL``, around it every
+        ``MIN_POLL_INTERVAL``, then less and less often while the server is late.
+        """
+        bounds = self.get_deadline_bounds(turn=turn)
+        if bounds is None:
+            return last_poll + MAX_POLL_INTERVAL
+        (lower, upper) = bounds
+        if now < lower - POLL_LEAD:
+            return min(last_poll + RESYNC_INTERVAL, lower - POLL_LEAD)
+        interval = MIN_POLL_INTERVAL + max(0.0, now - upper) * POLL_BACKOFF
+        return last_poll + min(interval, MAX_POLL_INTERVAL)
@@ -0,0 +1,70 @@
+import random
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+
+class ZobristKeys:
+    """Random 64-bit keys of one field size.
+
+    Keys are generated from a seed built from the field size, so every process gets the same keys.
+    """
+
+    def __init__(self, width: int, height: int):
+        size = width * height
+        self._size: int = size
+        self._rng: random.Random = random.Random(f"zobrist:{width}x{height}")
+        self.walls: list[array] = [array('Q', [0]) * size] + [self.create_keys() for _ in range(2)]
+        self.territory: list[array] = [self.create_keys() for _ in range(4)]
+        self.side: int = self._rng.getrandbits(64)
+        self._craftsmen: list[array] = []
+
+    def create_keys(self) -> array:
+        return array('Q', (self._rng.getrandbits(64) for _ in range(self._size)))
+
+    def get_craftsman_keys(self, craftsman: int) -> array:
+        while len(self._craftsmen) <= craftsman:
+            self._craftsmen.append(self.create_keys())
+        return self._craftsmen[craftsman]
+
+    def get_territory_key(self, index: int, flags: int) -> int:
+        key = 0
+        for bit, keys in enumerate(self.territory):
+            if flags & (1 << bit):
+                key ^= keys[index]
+        return key
+
+
+@lru_cache(maxsize=8)
+def get_zobrist_keys(width: int, height: int) -> ZobristKeys:
+    return ZobristKeys(width=width, height=height)
+
+
+class TranspositionTable:
+    """Cache keyed by board hash, the least recently used entry is evicted after ``max_size`` entries.
+
+    Only the number of entries is bounded: the planner tree still references evicted nodes from their parents,
+    eviction only stops new transpositions from being shared with them.
+    """
+
+    def __init__(self, max_size: int):
+        self._max_size: int = max_size
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def get(self, key: int, default=None):
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: int, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
@@ -0,0 +1,32 @@
+import json
+import random
+
+import pytest
+
+from app.models import GameResp
+
+# A Tk demo window, not a test.
+collect_ignore = ["app/test_main.py"]
+
+
+@pytest.fixture
+def make_field():
+    """Return a factory of fields with craftsmen given as ``(id, side, x, y)`` and ponds and castles as ``(x, y)``."""
+    def make_field(width: int, height: int, craftsmen=(), ponds=(), castles=()) -> GameResp.Field:
+        return GameResp.Field(
+            width=width, height=height, castle_coeff=10, wall_coeff=1, territory_coeff=3,
+            craftsmen=json.dumps([dict(id=id, side=side, x=x, y=y) for (id, side, x, y) in craftsmen]),
+            ponds=json.dumps([dict(x=x, y=y) for (x, y) in ponds]),
+            castles=json.dumps([dict(x=x, y=y) for (x, y) in castles]))
+    return make_field
+
+
+@pytest.fixture
+def make_random_field(make_field):
+    """Return a factory of fields with ``craftsman_count`` craftsmen per side and a few ponds and castles."""
+    def make_random_field(rng: random.Random, width: int, height: int, craftsman_count: int) -> GameResp.Field:
+        squares = rng.sample([(x, y) for x in range(width) for y in range(height)], craftsman_count * 2 + 6)
+        return make_field(width=width, height=height,
+                          craftsmen=[(str(i), "AB"[i % 2], x, y) for i, (x, y) in enumerate(squares[:-6])],
+                          ponds=squares[-6:-3], castles=squares[-3:])
+    return make_random_field